@@ -10,10 +10,30 @@ __author__ = "Jakob Rohde"
 __email__ = "jakob@example.com"
 __description__ = "A privacy-respecting Linux shell that translates natural language to bash commands using local LLMs"
 
-from .config import LLMShellConfig, load_config
-from .core import ShellSession, start_interactive_shell
-from .llm import LLMProvider, LLMResponse, OllamaProvider, create_llm_provider
-from .safety import CommandRisk, DangerLevel, SafetyAnalyzer
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .config import LLMShellConfig, load_config
+    from .core import ShellSession, start_interactive_shell
+    from .llm import LLMProvider, LLMResponse, OllamaProvider, create_llm_provider
+    from .safety import CommandRisk, DangerLevel, SafetyAnalyzer
+
+# Public names are resolved lazily so that `import llmshell` (and the CLI's
+# --help/--version paths) don't pay for pydantic, httpx and rich up front.
+_LAZY_ATTRS = {
+    "LLMShellConfig": ".config",
+    "load_config": ".config",
+    "ShellSession": ".core",
+    "start_interactive_shell": ".core",
+    "LLMProvider": ".llm",
+    "LLMResponse": ".llm",
+    "OllamaProvider": ".llm",
+    "create_llm_provider": ".llm",
+    "CommandRisk": ".safety",
+    "DangerLevel": ".safety",
+    "SafetyAnalyzer": ".safety",
+}
 
 __all__ = [
     "LLMShellConfig",
@@ -28,3 +48,17 @@ __all__ = [
     "DangerLevel",
     "CommandRisk",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import public attributes on first access."""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,162 @@
+"""Persistent caches of LLM translations and model lists."""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Translations older than this are ignored and eventually compacted away
+_TTL_SECONDS = 24 * 60 * 60
+_MAX_ENTRIES = 256
+# Rewrite the file once it holds this many times more lines than live entries
+_COMPACT_FACTOR = 4
+# Model lists change rarely, but a freshly pulled model should show up soon
+_MODELS_TTL_SECONDS = 60
+
+
+def translation_key(
+    natural_input: str, context: Dict[str, Any], model: str, temperature: float
+) -> str:
+    """Return the cache key for a request.
+
+    Only the parts of the context the prompt depends on are included, so the
+    key stays cheap to compute and unaffected by unrelated context fields.
+    The sampling settings are part of the key so that changing them does not
+    keep serving replies generated under the old ones.
+    """
+    signature = json.dumps(
+        [
+            natural_input,
+            context.get("cwd", ""),
+            context.get("project_type", ""),
+            context.get("git_branch") or "",
+            context.get("files", [])[:10],
+            model,
+            temperature,
+        ]
+    )
+    return hashlib.sha256(signature.encode()).hexdigest()
+
+
+class TranslationCache:
+    """Bounded LRU of translations, persisted as an append-only JSONL file."""
+
+    def __init__(
+        self, path: Path, max_entries: int = _MAX_ENTRIES, ttl: float = _TTL_SECONDS
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._loaded = False
+        self._lines_on_disk = 0
+
+    def _load(self):
+        """Read unexpired records from disk, later lines winning."""
+        self._loaded = True
+        cutoff = time.time() - self.ttl
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    self._lines_on_disk += 1
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn write from an interrupted session
+                    if record.get("t", 0) >= cutoff:
+                        self._remember(record)
+        except OSError:
+            pass
+
+    def _remember(self, record: Dict[str, Any]):
+        """Store a record as most recently used, evicting the oldest."""
+        key = record["key"]
+        self._entries[key] = record
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response fields for key, if fresh."""
+        if not self._loaded:
+            self._load()
+
+        record = self._entries.get(key)
+        if record is None:
+            return None
+        if record["t"] < time.time() - self.ttl:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return record["response"]
+
+    def put(self, key: str, response: Dict[str, Any]):
+        """Cache response fields for key and append them to the file."""
+        if not self._loaded:
+            self._load()
+
+        record = {"key": key, "t": time.time(), "response": response}
+        self._remember(record)
+
+        try:
+            if self._lines_on_disk >= _COMPACT_FACTOR * self.max_entries:
+                self._compact()
+            else:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+                self._lines_on_disk += 1
+        except OSError:
+            pass  # The in-memory cache keeps working without the file
+
+    def _compact(self):
+        """Rewrite the file with only the live entries."""
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in self._entries.values():
+                f.write(json.dumps(record) + "\n")
+        os.replace(tmp_path, self.path)
+        self._lines_on_disk = len(self._entries)
+
+
+class ModelListCache:
+    """Short-lived model lists per provider URL, persisted as one JSON file."""
+
+    def __init__(self, path: Path, ttl: float = _MODELS_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Read the file once per instance."""
+        if self._entries is None:
+            try:
+                with open(self.path, "rb") as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = None
+            self._entries = entries if isinstance(entries, dict) else {}
+        return self._entries
+
+    def get(self, base_url: str) -> Optional[List[str]]:
+        """Return the models listed at base_url, if fetched recently."""
+        record = self._load().get(base_url)
+        if record is None or record.get("t", 0) < time.time() - self.ttl:
+            return None
+        return record["models"]
+
+    def put(self, base_url: str, models: List[str]):
+        """Remember the models listed at base_url and rewrite the file."""
+        entries = self._load()
+        entries[base_url] = {"t": time.time(), "models": models}
+
+        tmp_path = self.path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # The in-memory cache keeps working without the file
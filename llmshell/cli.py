@@ -1,15 +1,40 @@
 """Command-line interface for LLMShell."""
 
-import asyncio
 from typing import Optional
 
 import click
 
-from .config import create_default_config, get_config_paths, load_config
-from .llm import create_llm_provider, test_llm_connection
 
+def run_async(coro):
+    """Run a coroutine to completion, on uvloop when it is installed."""
+    import asyncio
 
-@click.group()
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+
+    if hasattr(asyncio, "Runner"):  # Python 3.11+
+        loop_factory = uvloop.new_event_loop if uvloop else None
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            return runner.run(coro)
+
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(coro)
+
+
+class _CommandTableGroup(click.Group):
+    """Group whose subcommands are looked up in _COMMANDS when needed."""
+
+    def list_commands(self, ctx):
+        return sorted(_COMMANDS)
+
+    def get_command(self, ctx, cmd_name):
+        return _COMMANDS.get(cmd_name)
+
+
+@click.group(cls=_CommandTableGroup)
 @click.version_option(version="0.1.0")
 @click.option(
     "--config", "-c", type=click.Path(exists=True), help="Path to configuration file"
@@ -23,10 +48,12 @@ def cli(ctx, config: Optional[str], verbose: bool):
     ctx.obj["config_path"] = config
 
 
-@cli.command()
+@click.command(name="init")
 @click.pass_context
-def init(ctx):
+def init_command(ctx):
     """Initialize LLMShell configuration."""
+    from .config import create_default_config, get_config_paths
+
     click.echo("🚀 Initializing LLMShell...")
 
     # Find config directory
@@ -50,10 +77,18 @@ def init(ctx):
         click.echo(f"❌ Failed to create configuration: {e}", err=True)
 
 
-@cli.command()
+@click.command(name="test")
 @click.pass_context
-def test(ctx):
+def test_command(ctx):
     """Test LLM connection and basic functionality."""
+    from .config import load_config
+    from .llm import (
+        close_shared_http_clients,
+        create_llm_provider,
+        get_shared_http_client,
+        test_llm_connection,
+    )
+
     click.echo("🧪 Testing LLMShell connection...")
 
     try:
@@ -62,7 +97,9 @@ def test(ctx):
         click.echo(f"🔗 URL: {config.llm.base_url}")
 
         async def run_test():
-            provider = create_llm_provider(config.llm)
+            provider = create_llm_provider(
+                config.llm, http_client=get_shared_http_client(config.llm.timeout)
+            )
 
             # Test connection
             if await test_llm_connection(provider):
@@ -83,15 +120,16 @@ def test(ctx):
                 )
                 click.echo(f"3. Pull model if needed: ollama pull {config.llm.model}")
 
-            provider.close()
+            await provider.close()
+            await close_shared_http_clients()
 
-        asyncio.run(run_test())
+        run_async(run_test())
 
     except Exception as e:
         click.echo(f"❌ Test failed: {e}", err=True)
 
 
-@cli.command(name="shell")
+@click.command(name="shell")
 @click.option(
     "--safe-mode/--no-safe-mode", default=None, help="Enable/disable safe mode"
 )
@@ -101,8 +139,14 @@ def test(ctx):
 @click.pass_context
 def shell_command(ctx, safe_mode: Optional[bool], confirm: Optional[bool]):
     """Start the interactive LLMShell."""
+    from .config import load_config
     from .core import start_interactive_shell
-    from .llm import create_llm_provider, test_llm_connection
+    from .llm import (
+        close_shared_http_clients,
+        create_llm_provider,
+        get_shared_http_client,
+        test_llm_connection,
+    )
 
     click.echo("🚀 Starting LLMShell...")
 
@@ -121,7 +165,9 @@ def shell_command(ctx, safe_mode: Optional[bool], confirm: Optional[bool]):
 
         async def run_shell():
             # Create LLM provider
-            provider = create_llm_provider(config.llm)
+            provider = create_llm_provider(
+                config.llm, http_client=get_shared_http_client(config.llm.timeout)
+            )
 
             # Test connection
             if not await test_llm_connection(provider):
@@ -132,13 +178,17 @@ def shell_command(ctx, safe_mode: Optional[bool], confirm: Optional[bool]):
                     f"2. Check if model exists: ollama list | grep {config.llm.model}"
                 )
                 click.echo(f"3. Pull model if needed: ollama pull {config.llm.model}")
-                provider.close()
+                await provider.close()
+                await close_shared_http_clients()
                 return
 
             # Start interactive shell
-            await start_interactive_shell(config, provider)
+            try:
+                await start_interactive_shell(config, provider)
+            finally:
+                await close_shared_http_clients()
 
-        asyncio.run(run_shell())
+        run_async(run_shell())
 
     except KeyboardInterrupt:
         click.echo("\n👋 Goodbye!")
@@ -146,15 +196,12 @@ def shell_command(ctx, safe_mode: Optional[bool], confirm: Optional[bool]):
         click.echo(f"❌ Failed to start shell: {e}", err=True)
 
 
-def main():
-    """Main entry point for the CLI."""
-    cli()
-
-
-@cli.command()
+@click.command(name="config-show")
 @click.pass_context
-def config_show(ctx):
+def config_show_command(ctx):
     """Show current configuration."""
+    from .config import find_config_file, load_config
+
     try:
         config = load_config()
         click.echo("📋 Current LLMShell Configuration")
@@ -171,10 +218,9 @@ def config_show(ctx):
         click.echo(f"Log Commands: {config.logging.log_commands}")
 
         # Show config file location
-        for path in get_config_paths():
-            if path.exists():
-                click.echo(f"\nConfig file: {path}")
-                break
+        path = find_config_file()
+        if path is not None:
+            click.echo(f"\nConfig file: {path}")
         else:
             click.echo("\nNo config file found (using defaults)")
 
@@ -182,5 +228,18 @@ def config_show(ctx):
         click.echo(f"❌ Failed to load configuration: {e}", err=True)
 
 
+_COMMANDS = {
+    "init": init_command,
+    "test": test_command,
+    "shell": shell_command,
+    "config-show": config_show_command,
+}
+
+
+def main():
+    """Main entry point for the CLI."""
+    cli()
+
+
 if __name__ == "__main__":
     main()
@@ -1,13 +1,22 @@
 """Configuration management for LLMShell."""
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import yaml
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
+# Prefer the libyaml C bindings when PyYAML was built with them
+try:
+    from yaml import CSafeDumper as _YamlDumper
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+    from yaml import SafeLoader as _YamlLoader
+
 
 class LLMConfig(BaseModel):
     """Configuration for LLM integration."""
@@ -24,6 +33,9 @@ class LLMConfig(BaseModel):
     max_tokens: Optional[int] = Field(
         default=None, description="Maximum tokens to generate"
     )
+    cache_translations: bool = Field(
+        default=True, description="Reuse translations of repeated requests for 24h"
+    )
 
 
 class ExecutionConfig(BaseModel):
@@ -46,6 +58,9 @@ class ExecutionConfig(BaseModel):
         description="Commands that require extra confirmation",
     )
     timeout: int = Field(default=60, description="Command execution timeout")
+    persistent_shell: bool = Field(
+        default=False, description="Run commands in one long-lived bash process"
+    )
 
 
 class LoggingConfig(BaseModel):
@@ -68,8 +83,14 @@ class LLMShellConfig(BaseSettings):
         env_nested_delimiter = "__"
 
 
-def get_config_paths() -> list[Path]:
-    """Get list of possible configuration file paths in order of preference."""
+@lru_cache(maxsize=1)
+def get_config_paths() -> Tuple[Path, ...]:
+    """Get possible configuration file paths in order of preference.
+
+    The result is computed once per process; call ``clear_config_cache()``
+    if the working directory or environment changes and the paths must be
+    recomputed.
+    """
     paths = []
 
     # Current directory
@@ -89,34 +110,59 @@ def get_config_paths() -> list[Path]:
     paths.append(Path.home() / ".llmshell.yaml")
     paths.append(Path.home() / ".llmshell.yml")
 
-    return paths
+    return tuple(paths)
+
+
+def find_config_file() -> Optional[Path]:
+    """Return the first existing configuration file, or None."""
+    for path in get_config_paths():
+        # A bare stat skips the extra work Path.exists() does per candidate
+        try:
+            os.stat(path)
+        except OSError:
+            continue
+        return path
+    return None
 
 
 def load_config_file(path: Path) -> Dict[str, Any]:
     """Load configuration from a YAML file."""
     try:
         with open(path, "r") as f:
-            return yaml.safe_load(f) or {}
+            return yaml.load(f, Loader=_YamlLoader) or {}
     except FileNotFoundError:
         return {}
     except yaml.YAMLError as e:
         raise ValueError(f"Error parsing config file {path}: {e}")
 
 
-def load_config() -> LLMShellConfig:
-    """Load configuration from files and environment variables."""
-    config_data = {}
-
+@lru_cache(maxsize=1)
+def _parsed_config() -> LLMShellConfig:
+    """Parse the configuration once; callers get copies of the result."""
     # Load from config files (first found wins)
-    for path in get_config_paths():
-        if path.exists():
-            config_data = load_config_file(path)
-            break
+    path = find_config_file()
+    config_data = load_config_file(path) if path is not None else {}
 
     # Create config with file data and environment variables
     return LLMShellConfig(**config_data)
 
 
+def load_config() -> LLMShellConfig:
+    """Load configuration from files and environment variables.
+
+    The files are parsed once per process and each call returns its own copy,
+    so callers may change it without affecting later calls. Use
+    ``clear_config_cache()`` to force a reload.
+    """
+    return _parsed_config().model_copy(deep=True)
+
+
+def clear_config_cache() -> None:
+    """Forget the cached config paths and parsed configuration."""
+    get_config_paths.cache_clear()
+    _parsed_config.cache_clear()
+
+
 def create_default_config(path: Path) -> None:
     """Create a default configuration file."""
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -134,7 +180,16 @@ def create_default_config(path: Path) -> None:
     }
 
     with open(path, "w") as f:
-        yaml.dump(default_config, f, default_flow_style=False, indent=2)
+        yaml.dump(
+            default_config,
+            f,
+            Dumper=_YamlDumper,
+            default_flow_style=False,
+            indent=2,
+        )
+
+    # A new file may now shadow whatever was loaded before
+    _parsed_config.cache_clear()
 
 
 if __name__ == "__main__":
@@ -1,60 +1,141 @@
 """Enhanced context detection and analysis for LLMShell."""
 
-import json
 import os
+import re
 import subprocess
+from collections import Counter, OrderedDict
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
-
-from rich.console import Console
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# orjson is an optional speedup; the stdlib parser accepts the same bytes
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# Session environment reported to the LLM; it does not change while the
+# shell runs, so it is read once at import
+_ENV_USER = os.environ.get("USER", "unknown")
+_ENV_SHELL = os.environ.get("SHELL", "/bin/bash")
+
+# File extension to language name, used by detect_language_from_files
+_EXTENSION_MAP = {
+    ".py": "Python",
+    ".js": "JavaScript",
+    ".jsx": "JavaScript",
+    ".ts": "JavaScript",
+    ".tsx": "JavaScript",
+    ".java": "Java",
+    ".cpp": "C++",
+    ".cc": "C++",
+    ".cxx": "C++",
+    ".c": "C",
+    ".h": "C",
+    ".rs": "Rust",
+    ".go": "Go",
+    ".php": "PHP",
+    ".rb": "Ruby",
+    ".cs": "C#",
+    ".swift": "Swift",
+    ".kt": "Kotlin",
+    ".scala": "Scala",
+    ".pl": "Perl",
+    ".r": "R",
+    ".m": "Objective-C",
+    ".sh": "Shell",
+    ".bash": "Shell",
+    ".zsh": "Shell",
+}
+
+# Files whose presence marks a directory as a given project type
+_PYTHON_INDICATORS = frozenset(
+    {
+        "requirements.txt",
+        "pyproject.toml",
+        "setup.py",
+        "setup.cfg",
+        "pipfile",
+        "poetry.lock",
+        "conda.yml",
+        "environment.yml",
+    }
+)
+_NODEJS_INDICATORS = frozenset(
+    {"package.json", "yarn.lock", "package-lock.json", "pnpm-lock.yaml"}
+)
+_GO_INDICATORS = frozenset({"go.mod", "go.sum"})
+_JAVA_INDICATORS = frozenset({"pom.xml", "build.gradle", "build.gradle.kts"})
+_CPP_INDICATORS = frozenset({"cmake.txt", "makefile", "cmakelists.txt"})
+_WEB_INDICATORS = frozenset(
+    {"index.html", "webpack.config.js", ".babelrc", "vite.config.js"}
+)
+_DOCKER_INDICATORS = frozenset(
+    {"dockerfile", "docker-compose.yml", "docker-compose.yaml", ".dockerignore"}
+)
+_LINUX_CONFIG_INDICATORS = frozenset(
+    {".bashrc", ".zshrc", ".vimrc", ".tmux.conf", "ansible.cfg"}
+)
+
+# Extensions counted towards the C++ and script-directory heuristics
+_CPP_EXTENSIONS = (".cpp", ".cc", ".cxx", ".hpp", ".h")
+_SCRIPT_EXTENSIONS = (".sh", ".bash", ".zsh", ".fish", ".py", ".pl", ".rb")
+
+# Ends the package name in a requirements.txt line (specifier, extras, marker)
+_REQ_SPEC_RE = re.compile(r"[<>=~!;@\[\s]")
+
+# Dependencies kept per project
+_MAX_DEPENDENCIES = 20
+
+# Directories whose analysis is kept by EnhancedContextAnalyzer
+_PROJECT_CACHE_SIZE = 64
 
 
 def detect_language_from_files(filenames: List[str]) -> str:
     """Detect programming language from a list of filenames."""
-    language_counts = {}
-
-    extension_map = {
-        ".py": "Python",
-        ".js": "JavaScript",
-        ".jsx": "JavaScript",
-        ".ts": "JavaScript",
-        ".tsx": "JavaScript",
-        ".java": "Java",
-        ".cpp": "C++",
-        ".cc": "C++",
-        ".cxx": "C++",
-        ".c": "C",
-        ".h": "C",
-        ".rs": "Rust",
-        ".go": "Go",
-        ".php": "PHP",
-        ".rb": "Ruby",
-        ".cs": "C#",
-        ".swift": "Swift",
-        ".kt": "Kotlin",
-        ".scala": "Scala",
-        ".pl": "Perl",
-        ".r": "R",
-        ".m": "Objective-C",
-        ".sh": "Shell",
-        ".bash": "Shell",
-        ".zsh": "Shell",
-    }
+    language_counts: Counter = Counter()
 
     for filename in filenames:
-        path = Path(filename)
-        ext = path.suffix.lower()
-        if ext in extension_map:
-            lang = extension_map[ext]
-            language_counts[lang] = language_counts.get(lang, 0) + 1
+        ext = os.path.splitext(filename)[1].lower()
+        lang = _EXTENSION_MAP.get(ext)
+        if lang is not None:
+            language_counts[lang] += 1
 
     if not language_counts:
         return "Unknown"
 
-    # Return the most common language
-    return max(language_counts, key=language_counts.get)
+    # Return the most common language (ties go to the first one seen)
+    return language_counts.most_common(1)[0][0]
+
+
+def _parse_requirements(path: Path) -> List[str]:
+    """Extract package names from a requirements.txt file."""
+    deps = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            # Skip comments and pip options such as -r/-e/--index-url
+            if not line or line.startswith(("#", "-")):
+                continue
+            # Extract package name (before version specifier)
+            pkg_name = _REQ_SPEC_RE.split(line, maxsplit=1)[0]
+            if pkg_name:
+                deps.append(pkg_name)
+                if len(deps) >= _MAX_DEPENDENCIES:
+                    break
+    return deps
+
+
+def _parse_package_json(path: Path) -> List[str]:
+    """Extract dependency names from a package.json file."""
+    with open(path, "rb") as f:
+        data = _json_loads(f.read())
+    deps = []
+    for dep_type in ("dependencies", "devDependencies"):
+        if dep_type in data:
+            deps.extend(data[dep_type])
+    return deps[:_MAX_DEPENDENCIES]
 
 
 class ProjectType(Enum):
@@ -74,7 +155,7 @@ class ProjectType(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True)
 class ProjectContext:
     """Rich project context information."""
 
@@ -98,131 +179,134 @@ class EnhancedContextAnalyzer:
     """Advanced context analysis for better command suggestions."""
 
     def __init__(self):
-        self.console = Console()
-        self._project_cache: Dict[str, ProjectContext] = {}
+        # LRU of resolved path -> (directory mtime_ns, context)
+        self._project_cache: "OrderedDict[str, Tuple[int, ProjectContext]]" = (
+            OrderedDict()
+        )
+        # Manifest path -> ((mtime_ns, size), parsed dependency names)
+        self._file_cache: Dict[str, Tuple[Tuple[int, int], List[str]]] = {}
+        # Last LLM context built, keyed on (directory, mtime_ns)
+        self._last_llm_key: Optional[Tuple[str, int]] = None
+        self._last_llm_context: Optional[Dict[str, Any]] = None
 
     def analyze_directory(self, directory: Path) -> ProjectContext:
-        """Analyze a directory to determine project context."""
+        """Analyze a directory to determine project context.
+
+        Results are cached per directory and reused until the directory's
+        mtime changes (a file was added, removed or renamed in it).
+        """
         directory = directory.resolve()
         cache_key = str(directory)
+        try:
+            mtime = directory.stat().st_mtime_ns
+        except OSError:
+            mtime = 0
 
         # Check cache first
-        if cache_key in self._project_cache:
-            return self._project_cache[cache_key]
+        cached = self._project_cache.get(cache_key)
+        if cached is not None and cached[0] == mtime:
+            self._project_cache.move_to_end(cache_key)
+            return cached[1]
 
         context = self._detect_project_type(directory)
 
-        # Cache the result
-        self._project_cache[cache_key] = context
+        # Cache the result, evicting the least recently used directory
+        self._project_cache[cache_key] = (mtime, context)
+        self._project_cache.move_to_end(cache_key)
+        if len(self._project_cache) > _PROJECT_CACHE_SIZE:
+            self._project_cache.popitem(last=False)
         return context
 
+    def invalidate(self, directory: Optional[Path] = None) -> None:
+        """Drop cached analysis for a directory, or for all directories."""
+        self._last_llm_key = None
+        self._last_llm_context = None
+        if directory is None:
+            self._project_cache.clear()
+            self._file_cache.clear()
+        else:
+            self._project_cache.pop(str(directory.resolve()), None)
+
     def _detect_project_type(self, directory: Path) -> ProjectContext:
         """Detect the project type based on files and structure."""
         key_files = []
         project_types = []
 
-        # Look for specific files that indicate project type
+        # Look for specific files that indicate project type. A single
+        # scandir pass collects both files and subdirectories; DirEntry
+        # answers is_file()/is_dir() from d_type without an extra stat.
         files_in_dir = set()
+        dirs_in_dir = set()
+        ext_counts: Counter = Counter()
         try:
-            for item in directory.iterdir():
-                if item.is_file():
-                    files_in_dir.add(item.name.lower())
-                    key_files.append(item.name)
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        name = entry.name.lower()
+                        files_in_dir.add(name)
+                        ext_counts[os.path.splitext(name)[1]] += 1
+                        key_files.append(entry.name)
+                    elif entry.is_dir():
+                        dirs_in_dir.add(entry.name.lower())
         except PermissionError:
             pass
 
         # Python project detection
-        python_indicators = {
-            "requirements.txt",
-            "pyproject.toml",
-            "setup.py",
-            "setup.cfg",
-            "pipfile",
-            "poetry.lock",
-            "conda.yml",
-            "environment.yml",
-        }
-        if python_indicators & files_in_dir:
+        if _PYTHON_INDICATORS & files_in_dir:
             project_types.append((ProjectType.PYTHON, 0.9))
-        elif any(f.endswith(".py") for f in files_in_dir):
+        elif ext_counts[".py"]:
             project_types.append((ProjectType.PYTHON, 0.6))
 
         # Node.js project detection
-        nodejs_indicators = {
-            "package.json",
-            "yarn.lock",
-            "package-lock.json",
-            "pnpm-lock.yaml",
-        }
-        if nodejs_indicators & files_in_dir:
+        if _NODEJS_INDICATORS & files_in_dir:
             project_types.append((ProjectType.NODEJS, 0.9))
-        elif "node_modules" in [d.name for d in directory.iterdir() if d.is_dir()]:
+        elif "node_modules" in dirs_in_dir:
             project_types.append((ProjectType.NODEJS, 0.7))
 
         # Rust project detection
         if "cargo.toml" in files_in_dir:
             project_types.append((ProjectType.RUST, 0.95))
-        elif any(f.endswith(".rs") for f in files_in_dir):
+        elif ext_counts[".rs"]:
             project_types.append((ProjectType.RUST, 0.6))
 
         # Go project detection
-        go_indicators = {"go.mod", "go.sum"}
-        if go_indicators & files_in_dir:
+        if _GO_INDICATORS & files_in_dir:
             project_types.append((ProjectType.GO, 0.9))
-        elif any(f.endswith(".go") for f in files_in_dir):
+        elif ext_counts[".go"]:
             project_types.append((ProjectType.GO, 0.6))
 
         # Java project detection
-        java_indicators = {"pom.xml", "build.gradle", "build.gradle.kts"}
-        if java_indicators & files_in_dir:
+        if _JAVA_INDICATORS & files_in_dir:
             project_types.append((ProjectType.JAVA, 0.9))
-        elif any(f.endswith(".java") for f in files_in_dir):
+        elif ext_counts[".java"]:
             project_types.append((ProjectType.JAVA, 0.6))
 
         # C++ project detection
-        cpp_indicators = {"cmake.txt", "makefile", "cmakelists.txt"}
-        if cpp_indicators & files_in_dir:
+        if _CPP_INDICATORS & files_in_dir:
             project_types.append((ProjectType.CPP, 0.8))
-        elif any(
-            f.endswith((".cpp", ".cc", ".cxx", ".hpp", ".h")) for f in files_in_dir
-        ):
+        elif any(ext_counts[ext] for ext in _CPP_EXTENSIONS):
             project_types.append((ProjectType.CPP, 0.6))
 
         # Web project detection
-        web_indicators = {
-            "index.html",
-            "webpack.config.js",
-            ".babelrc",
-            "vite.config.js",
-        }
-        if web_indicators & files_in_dir:
+        if _WEB_INDICATORS & files_in_dir:
             project_types.append((ProjectType.WEB, 0.8))
 
         # Docker project detection
-        docker_indicators = {
-            "dockerfile",
-            "docker-compose.yml",
-            "docker-compose.yaml",
-            ".dockerignore",
-        }
-        if docker_indicators & files_in_dir:
+        if _DOCKER_INDICATORS & files_in_dir:
             project_types.append((ProjectType.DOCKER, 0.9))
 
         # Git repository detection
-        if (directory / ".git").exists():
+        # .git is a file rather than a directory in worktrees and submodules
+        if ".git" in dirs_in_dir or ".git" in files_in_dir:
             project_types.append((ProjectType.GIT, 0.7))
 
         # Linux config detection
-        config_indicators = {".bashrc", ".zshrc", ".vimrc", ".tmux.conf", "ansible.cfg"}
-        if config_indicators & files_in_dir:
+        if _LINUX_CONFIG_INDICATORS & files_in_dir:
             project_types.append((ProjectType.LINUX_CONFIG, 0.7))
 
         # Script directory detection
-        script_extensions = {".sh", ".bash", ".zsh", ".fish", ".py", ".pl", ".rb"}
-        script_files = [
-            f for f in files_in_dir if any(f.endswith(ext) for ext in script_extensions)
-        ]
-        if len(script_files) > 2:
+        script_count = sum(ext_counts[ext] for ext in _SCRIPT_EXTENSIONS)
+        if script_count > 2:
             project_types.append((ProjectType.SCRIPT, 0.6))
 
         # Determine the best match
@@ -286,26 +370,11 @@ class EnhancedContextAnalyzer:
                 break
 
         # Parse dependencies from requirements.txt
-        req_file = directory / "requirements.txt"
-        if req_file.exists():
-            try:
-                with open(req_file, "r") as f:
-                    deps = []
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith("#"):
-                            # Extract package name (before version specifier)
-                            pkg_name = (
-                                line.split("==")[0]
-                                .split(">=")[0]
-                                .split("<=")[0]
-                                .split("~=")[0]
-                                .strip()
-                            )
-                            deps.append(pkg_name)
-                    context.dependencies = deps[:20]  # Limit to first 20
-            except Exception:
-                pass
+        deps = self._load_dependencies(
+            directory / "requirements.txt", _parse_requirements
+        )
+        if deps is not None:
+            context.dependencies = deps
 
     def _enhance_nodejs_context(
         self, context: ProjectContext, directory: Path, files_in_dir: Set[str]
@@ -322,64 +391,83 @@ class EnhancedContextAnalyzer:
             context.package_manager = "npm"
 
         # Parse package.json for dependencies
-        package_json = directory / "package.json"
-        if package_json.exists():
-            try:
-                with open(package_json, "r") as f:
-                    data = json.load(f)
-                    deps = []
-                    for dep_type in ["dependencies", "devDependencies"]:
-                        if dep_type in data:
-                            deps.extend(list(data[dep_type].keys()))
-                    context.dependencies = deps[:20]  # Limit to first 20
-            except Exception:
-                pass
+        deps = self._load_dependencies(directory / "package.json", _parse_package_json)
+        if deps is not None:
+            context.dependencies = deps
+
+    def _load_dependencies(
+        self, path: Path, parser: Callable[[Path], List[str]]
+    ) -> Optional[List[str]]:
+        """Return dependencies parsed from a manifest, reusing earlier parses.
+
+        Parsed lists are cached per path and reused while the file's mtime
+        and size are unchanged. Returns None if the file is missing or
+        cannot be parsed.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        key = str(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._file_cache.get(key)
+        if cached is not None and cached[0] == signature:
+            return list(cached[1])
+
+        try:
+            deps = parser(path)
+        except Exception:
+            return None
+
+        self._file_cache[key] = (signature, deps)
+        return list(deps)
 
     def _enhance_git_context(self, context: ProjectContext, directory: Path):
         """Add Git-specific context."""
         try:
-            # Get current branch
-            result = subprocess.run(
-                ["git", "branch", "--show-current"],
-                cwd=directory,
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
-            if result.returncode == 0:
-                context.git_branch = result.stdout.strip()
-
-            # Get git status summary
+            # Branch and status summary come from a single git invocation
             result = subprocess.run(
-                ["git", "status", "--porcelain"],
+                ["git", "status", "--branch", "--porcelain=v2"],
                 cwd=directory,
                 capture_output=True,
                 text=True,
                 timeout=5,
             )
             if result.returncode == 0:
-                lines = result.stdout.strip().split("\n")
-                if lines and lines[0]:
-                    modified = len([l for l in lines if l.startswith(" M")])
-                    added = len([l for l in lines if l.startswith("A")])
-                    deleted = len([l for l in lines if l.startswith(" D")])
-                    untracked = len([l for l in lines if l.startswith("??")])
-
-                    status_parts = []
-                    if modified:
-                        status_parts.append(f"{modified}M")
-                    if added:
-                        status_parts.append(f"{added}A")
-                    if deleted:
-                        status_parts.append(f"{deleted}D")
-                    if untracked:
-                        status_parts.append(f"{untracked}??")
-
-                    context.git_status = (
-                        " ".join(status_parts) if status_parts else "clean"
-                    )
-                else:
-                    context.git_status = "clean"
+                lines = result.stdout.splitlines()
+                for line in lines:
+                    if line.startswith("# branch.head "):
+                        branch = line[len("# branch.head ") :]
+                        # A detached HEAD has no branch, which
+                        # `git branch --show-current` reported as ""
+                        context.git_branch = "" if branch == "(detached)" else branch
+                        break
+
+                # One pass keyed on the XY status of changed entries
+                # ("1 XY ..."/"2 XY ...", X=index, Y=worktree); untracked
+                # and unmerged records are keyed on their type character.
+                records = Counter(
+                    line[2:4] if line[0] in "12" else line[0]
+                    for line in lines
+                    if line and line[0] != "#"
+                )
+                modified = records[".M"]
+                added = sum(n for xy, n in records.items() if xy[0] == "A")
+                deleted = records[".D"]
+                untracked = records["?"]
+
+                status_parts = []
+                if modified:
+                    status_parts.append(f"{modified}M")
+                if added:
+                    status_parts.append(f"{added}A")
+                if deleted:
+                    status_parts.append(f"{deleted}D")
+                if untracked:
+                    status_parts.append(f"{untracked}??")
+
+                context.git_status = " ".join(status_parts) if status_parts else "clean"
         except Exception:
             pass
 
@@ -397,7 +485,21 @@ class EnhancedContextAnalyzer:
             context.package_manager = "docker"
 
     def get_context_for_llm(self, directory: Path) -> Dict[str, Any]:
-        """Get enhanced context specifically formatted for LLM prompts."""
+        """Get enhanced context specifically formatted for LLM prompts.
+
+        The result for the most recent directory is reused until the user
+        changes directory or the directory's contents change, so repeated
+        prompts from the same place cost a single stat. Callers must treat
+        the returned dict as read-only.
+        """
+        try:
+            mtime = directory.stat().st_mtime_ns
+        except OSError:
+            mtime = 0
+        key = (str(directory), mtime)
+        if key == self._last_llm_key and self._last_llm_context is not None:
+            return self._last_llm_context
+
         basic_context = self._get_basic_context(directory)
         project_context = self.analyze_directory(directory)
 
@@ -419,6 +521,8 @@ class EnhancedContextAnalyzer:
             ),
         }
 
+        self._last_llm_key = key
+        self._last_llm_context = enhanced_context
         return enhanced_context
 
     def _get_basic_context(self, directory: Path) -> Dict[str, Any]:
@@ -426,17 +530,20 @@ class EnhancedContextAnalyzer:
         try:
             files = []
             try:
-                files = [
-                    f.name for f in directory.iterdir() if not f.name.startswith(".")
-                ][:10]
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if not entry.name.startswith("."):
+                            files.append(entry.name)
+                            if len(files) >= 10:
+                                break
             except PermissionError:
                 pass
 
             return {
                 "cwd": str(directory),
-                "user": os.getenv("USER", "unknown"),
+                "user": _ENV_USER,
                 "files": files,
-                "shell": os.getenv("SHELL", "/bin/bash"),
+                "shell": _ENV_SHELL,
             }
         except Exception:
             return {"cwd": str(directory)}
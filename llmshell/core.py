@@ -1,22 +1,40 @@
 """Core shell logic for LLMShell."""
 
+import asyncio
+import codecs
 import os
+import re
+import selectors
 import shlex
+import shutil
+import stat
 import subprocess
 import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
 from rich.prompt import Confirm, Prompt
-from rich.syntax import Syntax
 from rich.text import Text
 
-from .config import LLMShellConfig
+from .cache import ModelListCache, TranslationCache, translation_key
 from .context import EnhancedContextAnalyzer, ProjectContext
 from .history import CommandType, HistoryEntry, HistoryManager
-from .llm import LLMProvider, LLMResponse
 from .safety import (
     CommandRisk,
     DangerLevel,
@@ -24,26 +42,271 @@ from .safety import (
     get_danger_level_color,
     get_danger_level_emoji,
 )
+from .shell import PersistentShell
+
+if TYPE_CHECKING:
+    # Only needed for annotations; importing them would pull in pydantic and
+    # httpx before a session is actually started
+    from rich.syntax import Syntax
+
+    from .config import LLMShellConfig
+    from .llm import LLMProvider, LLMResponse
+
+# Static pieces of the command preview panel
+_BLANK_LINE = Text("")
+_SAFETY_CONCERNS_HEADER = Text("⚠️  Safety Concerns:", style="bold yellow")
+_SUGGESTIONS_HEADER = Text("💡 Suggestions:", style="bold cyan")
+_RISK_PANEL_STYLES = {
+    level: (
+        f"{get_danger_level_emoji(level)} Generated Command "
+        f"({level.name.title()} Risk)",
+        get_danger_level_color(level),
+    )
+    for level in DangerLevel
+}
+# Header shown for direct commands risky enough to explain before confirming
+_RISK_DETECTED_HEADERS = {
+    level: Text(
+        f"{get_danger_level_emoji(level)} {level.name.title()} Risk Command Detected!",
+        style=f"bold {get_danger_level_color(level)}",
+    )
+    for level in (DangerLevel.MEDIUM, DangerLevel.HIGH, DangerLevel.CRITICAL)
+}
+_SAFETY_TIPS_HEADER = Text("💡 Safety Tips:", style="bold cyan")
+
+# Confirmation flow per risk level: warnings printed first, then each prompt
+# with its default and the message shown when it is declined
+_CRITICAL_WARNING = Text(
+    "💀 CRITICAL WARNING: This command is extremely dangerous!",
+    style="bold bright_red",
+)
+_HIGH_RISK_WARNING = Text(
+    "🚨 HIGH RISK: This command could cause significant damage!", style="bold red"
+)
+_HIGH_RISK_PROMPT = (
+    "Are you sure you want to execute this high-risk command?",
+    False,
+    "Command cancelled.",
+)
+_EXECUTE_PROMPT = ("Execute this command?", True, "Command cancelled.")
+_NATURAL_CONFIRMATIONS = {
+    DangerLevel.CRITICAL: (
+        (
+            _CRITICAL_WARNING,
+            Text("This command could cause irreversible system damage!", style="red"),
+        ),
+        (
+            (
+                "Type 'I understand the risks' to continue",
+                False,
+                "Command cancelled for safety.",
+            ),
+            (
+                "Are you absolutely certain you want to proceed?",
+                False,
+                "Command cancelled.",
+            ),
+        ),
+    ),
+    DangerLevel.HIGH: ((_HIGH_RISK_WARNING,), (_HIGH_RISK_PROMPT,)),
+    DangerLevel.MEDIUM: (
+        (
+            Text(
+                "🔶 MODERATE RISK: This command requires careful consideration.",
+                style="bold orange3",
+            ),
+        ),
+        (
+            (
+                "Proceed with this potentially risky command?",
+                True,
+                "Command cancelled.",
+            ),
+        ),
+    ),
+    DangerLevel.LOW: ((), (_EXECUTE_PROMPT,)),
+    DangerLevel.SAFE: ((), (_EXECUTE_PROMPT,)),
+}
+_DIRECT_LOW_RISK_CONFIRMATION = (
+    (),
+    (
+        (
+            "Are you sure you want to execute this command?",
+            True,
+            "Command cancelled.",
+        ),
+    ),
+)
+_DIRECT_CONFIRMATIONS = {
+    DangerLevel.CRITICAL: (
+        (_CRITICAL_WARNING,),
+        (
+            (
+                "Are you absolutely certain you want to proceed?",
+                False,
+                "Command cancelled for safety.",
+            ),
+        ),
+    ),
+    DangerLevel.HIGH: ((_HIGH_RISK_WARNING,), (_HIGH_RISK_PROMPT,)),
+    DangerLevel.MEDIUM: (
+        (),
+        (
+            (
+                "Proceed with this potentially risky command?",
+                False,
+                "Command cancelled.",
+            ),
+        ),
+    ),
+    DangerLevel.LOW: _DIRECT_LOW_RISK_CONFIRMATION,
+    DangerLevel.SAFE: _DIRECT_LOW_RISK_CONFIRMATION,
+}
+
+# Streamed command output is read in chunks; only the tail is kept for history
+_STREAM_READ_SIZE = 65536
+_STREAM_TAIL_BYTES = 1024 * 1024
+
+# Number of recent commands kept in memory
+_MEMORY_HISTORY_SIZE = 50
+
+# Number of safety verdicts kept per directory context
+_RISK_CACHE_SIZE = 256
+
+# Simple heuristics to detect natural language vs commands
+_NATURAL_LANGUAGE_RE = re.compile(
+    r"\b(?:please|can you|how to|show me|find all|list all|what is|where is"
+    r"|count|display|get|make)\b",
+    re.IGNORECASE,
+)
+_SENTENCE_PUNCTUATION = frozenset("?.,;")
+_DIRECT_COMMANDS = frozenset(
+    {
+        "ls",
+        "cd",
+        "pwd",
+        "grep",
+        "find",
+        "ps",
+        "df",
+        "free",
+        "chmod",
+        "chown",
+        "mv",
+        "cp",
+        "rm",
+        "mkdir",
+        "rmdir",
+    }
+)
+
+# Characters that need /bin/sh to interpret; anything else can be exec'd directly
+_SHELL_METACHARACTERS = frozenset("|&;<>()$`\\*?[]{}~#\n")
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedInput:
+    """User input tokenized once and shared by detection, cd and execution."""
+
+    raw: str
+    tokens: Tuple[str, ...]
+    # True when no shell features are used and shlex could parse the input
+    simple: bool
+
+    @classmethod
+    def parse(cls, text: str) -> "ParsedInput":
+        """Tokenize text, falling back to whitespace words on broken quoting."""
+        simple = _SHELL_METACHARACTERS.isdisjoint(text)
+        try:
+            tokens = tuple(shlex.split(text))
+        except ValueError:
+            tokens, simple = tuple(text.split()), False
+        return cls(text, tokens, simple)
+
+    @property
+    def first(self) -> str:
+        """The first token, or an empty string."""
+        return self.tokens[0] if self.tokens else ""
+
+    @property
+    def argv(self) -> Optional[List[str]]:
+        """Argv to exec directly, or None when a shell is needed."""
+        if not self.simple or not self.tokens or "=" in self.tokens[0]:
+            return None  # shell syntax, empty, or a VAR=value prefix
+        return list(self.tokens)
+
+
+@lru_cache(maxsize=128)
+def _command_syntax(command: str) -> "Syntax":
+    """Return the highlighted preview for a command, reused for repeats."""
+    # Imported here because rich.syntax pulls in pygments, which is only
+    # needed once the first preview is shown
+    from rich.syntax import Syntax
+
+    return Syntax(command, "bash", theme="monokai", line_numbers=False)
 
 
 class ShellSession:
     """Main shell session handler with enhanced history and context."""
 
-    def __init__(self, config: LLMShellConfig, llm_provider: LLMProvider):
+    def __init__(self, config: "LLMShellConfig", llm_provider: "LLMProvider"):
         self.config = config
         self.llm_provider = llm_provider
         self.console = Console()
-        self.history: List[str] = (
-            []
-        )  # Keep in-memory history for backward compatibility
+        # Keep in-memory history for backward compatibility
+        self.history: Deque[Tuple[str, str, bool]] = deque(maxlen=_MEMORY_HISTORY_SIZE)
         self.current_directory = Path.cwd()
         self.ai_mode = True
         self.safety_analyzer = SafetyAnalyzer()
+        self._risk_cache: "OrderedDict[str, CommandRisk]" = OrderedDict()
+        self._risk_cache_context: Optional[Dict[str, Any]] = None
 
         # Enhanced features
         self.history_manager = HistoryManager()
         self.context_analyzer = EnhancedContextAnalyzer()
         self.current_project_context: Optional[ProjectContext] = None
+        self.persistent_shell: Optional[PersistentShell] = (
+            PersistentShell()
+            if config.execution.persistent_shell and shutil.which("bash")
+            else None
+        )
+        self.translation_cache: Optional[TranslationCache] = (
+            TranslationCache(self.history_manager.data_dir / "translate_cache.jsonl")
+            if config.llm.cache_translations
+            else None
+        )
+        self.model_cache = ModelListCache(self.history_manager.data_dir / "models.json")
+
+        # Dot commands: exact matches first, then commands taking an argument
+        self._special_commands: Dict[str, Callable[[], Any]] = {
+            ".exit": self._cmd_exit,
+            ".quit": self._cmd_exit,
+            ".q": self._cmd_exit,
+            ".help": self._cmd_help,
+            ".h": self._cmd_help,
+            ".mode": self._cmd_mode,
+            ".clear": self._cmd_clear,
+            ".pwd": self._cmd_pwd,
+            ".history": self._cmd_history,
+            ".history stats": self._cmd_history_stats,
+            ".history clear": self._cmd_history_clear,
+            ".context": self._cmd_context,
+            ".context analyze": self._cmd_context_analyze,
+            ".models": self._cmd_models,
+            ".model": self._cmd_model,
+        }
+        self._prefixed_commands: List[Tuple[str, Callable[[str], Any]]] = [
+            (".history search ", self._cmd_history_search),
+            (".history export ", self._cmd_history_export),
+            (".suggest ", self._cmd_suggest),
+            (".model ", self._cmd_switch_model),
+        ]
+        # Async work requested by the handlers above, keyed by kind
+        self._async_commands: Dict[str, Callable[[Optional[str]], Awaitable[Any]]] = {
+            "models": lambda _: self.show_models(),
+            "switch_model": self.switch_model,
+            "suggest": self.show_suggestions,
+        }
 
         # Load previous session history
         self._load_session_context()
@@ -57,172 +320,270 @@ class ShellSession:
 
         # Load recent history into memory for quick access
         recent_entries = self.history_manager.get_recent_entries(limit=10)
-        self.history = [
+        self.history.clear()
+        self.history.extend(
             (entry.user_input, entry.translated_command, entry.success)
             for entry in recent_entries
-        ]
+        )
 
     def get_context(self) -> Dict[str, Any]:
         """Get current context for LLM prompts with enhanced information."""
-        # Use enhanced context analyzer
+        # The analyzer reuses its last result while the directory and its
+        # mtime are unchanged, so this is cheap to call several times per input
         return self.context_analyzer.get_context_for_llm(self.current_directory)
 
     def analyze_command_safety(self, command: str) -> "CommandRisk":
         """Analyze command safety using advanced detection."""
         context = self.get_context()
-        return self.safety_analyzer.analyze_command(command, context)
+        # The context dict is only replaced when the directory or its contents
+        # change, so earlier verdicts stay valid while it is the same object
+        if context is not self._risk_cache_context:
+            self._risk_cache.clear()
+            self._risk_cache_context = context
+
+        risk = self._risk_cache.get(command)
+        if risk is not None:
+            self._risk_cache.move_to_end(command)
+            return risk
+
+        risk = self.safety_analyzer.analyze_command(command, context)
+        self._risk_cache[command] = risk
+        if len(self._risk_cache) > _RISK_CACHE_SIZE:
+            self._risk_cache.popitem(last=False)
+        return risk
 
     def is_dangerous_command(self, command: str) -> bool:
         """Check if command is potentially dangerous (legacy method)."""
         risk = self.analyze_command_safety(command)
         return risk.is_dangerous
 
-    def detect_command_type(self, user_input: str) -> str:
+    def detect_command_type(self, user_input: Union[str, ParsedInput]) -> str:
         """Detect if input is natural language or direct command."""
-        # Simple heuristics to detect natural language vs commands
-        natural_language_indicators = [
-            "please",
-            "can you",
-            "how to",
-            "show me",
-            "find all",
-            "list all",
-            "what is",
-            "where is",
-            "count",
-            "display",
-            "get",
-            "make",
-        ]
+        if isinstance(user_input, str):
+            user_input = ParsedInput.parse(user_input)
 
         # If it starts with common shell commands, treat as direct command
-        if user_input.strip().split()[0] in [
-            "ls",
-            "cd",
-            "pwd",
-            "grep",
-            "find",
-            "ps",
-            "df",
-            "free",
-            "chmod",
-            "chown",
-            "mv",
-            "cp",
-            "rm",
-            "mkdir",
-            "rmdir",
-        ]:
+        if user_input.first in _DIRECT_COMMANDS:
             return "direct"
 
         # If it contains natural language indicators, treat as natural language
-        if any(
-            indicator in user_input.lower() for indicator in natural_language_indicators
-        ):
+        if _NATURAL_LANGUAGE_RE.search(user_input.raw):
             return "natural"
 
         # If it's very short and doesn't contain spaces, likely a command
-        if len(user_input.split()) <= 2 and not any(
-            char in user_input for char in "?.,;"
+        if len(user_input.tokens) <= 2 and _SENTENCE_PUNCTUATION.isdisjoint(
+            user_input.raw
         ):
             return "direct"
 
         # Default to natural language if in AI mode
         return "natural" if self.ai_mode else "direct"
 
-    async def translate_command(self, natural_input: str) -> LLMResponse:
+    async def translate_command(
+        self, natural_input: str, context: Optional[Dict[str, Any]] = None
+    ) -> "LLMResponse":
         """Translate natural language to bash command."""
+        if context is None:
+            context = self.get_context()
+        if self.translation_cache is None:
+            return await self.llm_provider.translate(natural_input, context)
+
+        llm_config = self.llm_provider.config
+        key = translation_key(
+            natural_input, context, llm_config.model, llm_config.temperature
+        )
+        cached = self.translation_cache.get(key)
+        if cached is not None:
+            from .llm import LLMResponse
+
+            return LLMResponse(**cached)
+
+        response = await self.llm_provider.translate(natural_input, context)
+        if not response.error and response.command.strip():
+            self.translation_cache.put(
+                key,
+                {
+                    "command": response.command,
+                    "explanation": response.explanation,
+                    "confidence": response.confidence,
+                },
+            )
+        return response
+
+    async def translate_commands(
+        self, inputs: List[str], max_parallel: int = 4
+    ) -> List["LLMResponse"]:
+        """Translate several inputs concurrently, keeping at most max_parallel in flight."""
         context = self.get_context()
-        return await self.llm_provider.translate(natural_input, context)
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        async def _translate(natural_input: str) -> "LLMResponse":
+            async with semaphore:
+                return await self.translate_command(natural_input, context)
+
+        return list(await asyncio.gather(*(_translate(text) for text in inputs)))
 
     def execute_command(
         self,
-        command: str,
+        command: Union[str, ParsedInput],
         user_input: str = "",
         command_type: CommandType = CommandType.DIRECT,
+        stream: bool = False,
     ) -> Tuple[bool, str, str]:
-        """Execute a bash command and return (success, stdout, stderr) with history tracking."""
-        start_time = time.time()
+        """Execute a bash command and return (success, stdout, stderr) with history tracking.
+
+        With stream=True the output is written to the console while the command
+        runs, and the returned stdout/stderr keep only the tail of each stream.
+        """
+        start_ns = time.perf_counter_ns()
+        streamed = False
+        parsed = (
+            command if isinstance(command, ParsedInput) else ParsedInput.parse(command)
+        )
+        command = parsed.raw
 
         try:
             # Handle built-in commands
-            if command.strip().startswith("cd "):
-                success, stdout, stderr = self._handle_cd_command(command)
-                execution_time = int((time.time() - start_time) * 1000)
-
-                # Record in history
-                self._record_command_history(
-                    user_input or command,
-                    command,
-                    command_type,
-                    success,
-                    execution_time,
-                    0 if success else 1,
-                    stderr,
-                )
+            if parsed.first == "cd":
+                success, stdout, stderr = self._handle_cd_command(parsed)
+                exit_code = 0 if success else 1
+            else:
+                # Execute external command
+                if stream and self.persistent_shell is None:
+                    streamed = True
+                    result = self._stream_external_command(parsed)
+                else:
+                    result = self._run_external_command(parsed)
+                stdout, stderr = result.stdout, result.stderr
+                exit_code = result.returncode
+                success = exit_code == 0
 
-                return success, stdout, stderr
+        except subprocess.TimeoutExpired:
+            success, stdout, exit_code = False, "", -1
+            stderr = f"Command timed out after {self.config.execution.timeout} seconds"
+        except Exception as e:
+            success, stdout, exit_code = False, "", -1
+            stderr = f"Execution error: {str(e)}"
+
+        execution_time = (time.perf_counter_ns() - start_ns) // 1_000_000
+        if stream and not streamed:
+            self._write_output(stdout, stderr)
+
+        # Record in history
+        self._record_command_history(
+            user_input or command,
+            command,
+            command_type,
+            success,
+            execution_time,
+            exit_code,
+            stderr,
+        )
 
-            # Execute external command
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=self.config.execution.timeout,
-                cwd=self.current_directory,
-            )
+        return success, stdout, stderr
 
-            execution_time = int((time.time() - start_time) * 1000)
-            success = result.returncode == 0
-
-            # Record in history
-            self._record_command_history(
-                user_input or command,
-                command,
-                command_type,
-                success,
-                execution_time,
-                result.returncode,
-                result.stderr,
+    def _run_external_command(
+        self, command: ParsedInput
+    ) -> subprocess.CompletedProcess:
+        """Run an external command, skipping the /bin/sh fork when possible."""
+        if self.persistent_shell is not None:
+            result, cwd = self.persistent_shell.run(
+                command.raw, self.current_directory, self.config.execution.timeout
             )
+            if cwd != self.current_directory:  # the command changed directory
+                self._change_directory(cwd)
+            return result
 
-            return success, result.stdout, result.stderr
+        argv = command.argv
+        if argv is not None:
+            try:
+                return subprocess.run(
+                    argv,
+                    capture_output=True,
+                    text=True,
+                    timeout=self.config.execution.timeout,
+                    cwd=self.current_directory,
+                )
+            except OSError:
+                pass  # Shell builtins and missing programs are left to the shell
+
+        return subprocess.run(
+            command.raw,
+            shell=True,
+            capture_output=True,
+            text=True,
+            timeout=self.config.execution.timeout,
+            cwd=self.current_directory,
+        )
 
-        except subprocess.TimeoutExpired:
-            execution_time = int((time.time() - start_time) * 1000)
-            error_msg = (
-                f"Command timed out after {self.config.execution.timeout} seconds"
-            )
+    def _stream_external_command(
+        self, command: ParsedInput
+    ) -> subprocess.CompletedProcess:
+        """Run an external command, echoing its output as it arrives."""
+        process = self._spawn_streaming(command)
+        tails = {process.stdout: bytearray(), process.stderr: bytearray()}
+        decoders = {
+            stream: codecs.getincrementaldecoder("utf-8")(errors="replace")
+            for stream in tails
+        }
+        timeout = self.config.execution.timeout
+        deadline = time.monotonic() + timeout
 
-            # Record timeout in history
-            self._record_command_history(
-                user_input or command,
-                command,
-                command_type,
-                False,
-                execution_time,
-                -1,
-                error_msg,
-            )
+        try:
+            with selectors.DefaultSelector() as selector:
+                for stream in tails:
+                    selector.register(stream, selectors.EVENT_READ)
+
+                while selector.get_map():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise subprocess.TimeoutExpired(command, timeout)
+
+                    for key, _ in selector.select(remaining):
+                        chunk = os.read(key.fd, _STREAM_READ_SIZE)
+                        if not chunk:
+                            selector.unregister(key.fileobj)
+                            continue
+
+                        # Chunks may split markup or lines, so print them verbatim
+                        text = decoders[key.fileobj].decode(chunk)
+                        if text and key.fileobj is process.stdout:
+                            self.console.print(text, end="", markup=False)
+                        elif text:
+                            self.console.print(Text(text, style="red"), end="")
+
+                        tail = tails[key.fileobj]
+                        tail += chunk
+                        if len(tail) > _STREAM_TAIL_BYTES:
+                            del tail[:-_STREAM_TAIL_BYTES]
+
+            returncode = process.wait(timeout=max(deadline - time.monotonic(), 0))
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            process.stdout.close()
+            process.stderr.close()
+
+        stdout, stderr = (
+            tails[stream].decode("utf-8", errors="replace") for stream in tails
+        )
+        return subprocess.CompletedProcess(command.raw, returncode, stdout, stderr)
 
-            return False, "", error_msg
-        except Exception as e:
-            execution_time = int((time.time() - start_time) * 1000)
-            error_msg = f"Execution error: {str(e)}"
-
-            # Record error in history
-            self._record_command_history(
-                user_input or command,
-                command,
-                command_type,
-                False,
-                execution_time,
-                -1,
-                error_msg,
-            )
+    def _spawn_streaming(self, command: ParsedInput) -> subprocess.Popen:
+        """Start an external command with piped output, skipping /bin/sh when possible."""
+        kwargs = dict(
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=self.current_directory
+        )
+        argv = command.argv
+        if argv is not None:
+            try:
+                return subprocess.Popen(argv, **kwargs)
+            except OSError:
+                pass  # Shell builtins and missing programs are left to the shell
 
-            return False, "", error_msg
+        return subprocess.Popen(command.raw, shell=True, **kwargs)
 
     def _record_command_history(
         self,
@@ -253,26 +614,26 @@ class ShellSession:
                 ),
             )
 
-            # Add to persistent history
-            self.history_manager.add_entry(entry)
+            # Queue for persistent history; written in batches
+            self.history_manager.queue_entry(entry)
 
-            # Add to in-memory history for backward compatibility
+            # Add to in-memory history; the deque drops entries past its cap
             self.history.append((user_input, command, success))
 
-            # Keep only last 50 entries in memory
-            if len(self.history) > 50:
-                self.history = self.history[-50:]
-
         except Exception as e:
             # Don't let history recording break command execution
             self.console.print(
                 f"Warning: Failed to record history: {e}", style="dim yellow"
             )
 
-    def _handle_cd_command(self, command: str) -> Tuple[bool, str, str]:
+    def _handle_cd_command(
+        self, command: Union[str, ParsedInput]
+    ) -> Tuple[bool, str, str]:
         """Handle cd command specially to change session directory and refresh context."""
         try:
-            parts = shlex.split(command)
+            if isinstance(command, str):
+                command = ParsedInput.parse(command)
+            parts = command.tokens
             if len(parts) == 1:  # just "cd"
                 target = Path.home()
             else:
@@ -285,15 +646,13 @@ class ShellSession:
                     target = self.current_directory / target_str
 
             target = target.resolve()
-            if target.exists() and target.is_dir():
-                self.current_directory = target
-                os.chdir(target)  # Also change the process directory
-
-                # Refresh project context when changing directories
-                self.current_project_context = self.context_analyzer.analyze_directory(
-                    self.current_directory
-                )
+            try:
+                is_dir = stat.S_ISDIR(os.stat(target).st_mode)
+            except OSError:
+                is_dir = False
 
+            if is_dir:
+                self._change_directory(target)
                 return True, str(target), ""
             else:
                 return False, "", f"Directory not found: {target}"
@@ -301,6 +660,16 @@ class ShellSession:
         except Exception as e:
             return False, "", f"cd error: {str(e)}"
 
+    def _change_directory(self, target: Path):
+        """Move the session to target and refresh the project context."""
+        self.current_directory = target
+        os.chdir(target)  # Also change the process directory
+
+        # Refresh project context when changing directories
+        self.current_project_context = self.context_analyzer.analyze_directory(
+            self.current_directory
+        )
+
     def display_command_preview(
         self,
         command: str,
@@ -309,14 +678,11 @@ class ShellSession:
     ):
         """Display command preview with syntax highlighting and safety information."""
         # Create syntax highlighted command
-        syntax = Syntax(command, "bash", theme="monokai", line_numbers=False)
+        syntax = _command_syntax(command)
 
         # Determine panel title and style based on risk level
         if risk:
-            emoji = get_danger_level_emoji(risk.level)
-            level_name = risk.level.name.title()
-            panel_title = f"{emoji} Generated Command ({level_name} Risk)"
-            border_style = get_danger_level_color(risk.level)
+            panel_title, border_style = _RISK_PANEL_STYLES[risk.level]
         else:
             panel_title = "🤖 Generated Command"
             border_style = "blue"
@@ -327,22 +693,22 @@ class ShellSession:
         # Add explanation if provided
         if explanation:
             content_parts.append(Text(f"📝 {explanation}", style="dim"))
-            content_parts.append(Text(""))  # Empty line
+            content_parts.append(_BLANK_LINE)
 
         # Add the command
         content_parts.append(syntax)
 
         # Add safety information if risk is provided
         if risk and (risk.reasons or risk.suggestions):
-            content_parts.append(Text(""))  # Empty line
+            content_parts.append(_BLANK_LINE)
 
             if risk.reasons:
-                content_parts.append(Text("⚠️  Safety Concerns:", style="bold yellow"))
+                content_parts.append(_SAFETY_CONCERNS_HEADER)
                 for reason in risk.reasons:
                     content_parts.append(Text(f"  • {reason}", style="yellow"))
 
             if risk.suggestions:
-                content_parts.append(Text("💡 Suggestions:", style="bold cyan"))
+                content_parts.append(_SUGGESTIONS_HEADER)
                 for suggestion in risk.suggestions:
                     content_parts.append(Text(f"  • {suggestion}", style="cyan"))
 
@@ -350,26 +716,39 @@ class ShellSession:
         if len(content_parts) == 1:
             panel_content = content_parts[0]
         else:
-            from rich.console import Group
-
             panel_content = Group(*content_parts)
 
         panel = Panel(panel_content, title=panel_title, border_style=border_style)
 
         self.console.print(panel)
 
-    def display_output(self, success: bool, stdout: str, stderr: str):
-        """Display command execution output."""
-        if stdout.strip():
-            self.console.print(stdout, end="")
+    def display_output(
+        self, success: bool, stdout: str, stderr: str, already_shown: bool = False
+    ):
+        """Display command execution output.
 
-        if stderr.strip():
-            error_text = Text(stderr, style="red")
-            self.console.print(error_text, end="")
+        Pass already_shown=True for streamed output so only the failure notice
+        is added.
+        """
+        if not already_shown:
+            self._write_output(stdout, stderr)
 
         if not success and not stderr.strip():
             self.console.print(Text("Command failed with no error output", style="red"))
 
+    def _write_output(self, stdout: str, stderr: str):
+        """Write command output to the console, stderr in red."""
+        parts = []
+        if stdout.strip():
+            parts.append(stdout)
+
+        if stderr.strip():
+            parts.append(Text(stderr, style="red"))
+
+        # One print renders and writes both streams together
+        if parts:
+            self.console.print(*parts, sep="", end="")
+
     def show_help(self):
         """Show help information."""
         help_text = """
@@ -506,17 +885,31 @@ Type: {pc.project_type.value.title()} (confidence: {pc.confidence:.1%})"""
             self.console.print("No commands in history yet.", style="dim")
             return
 
-        self.console.print("\n📜 Command History:", style="bold")
-        for i, (original, command, success) in enumerate(self.history[-10:], 1):
+        lines = [Text("\n📜 Command History:", style="bold")]
+        for i, (original, command, success) in enumerate(list(self.history)[-10:], 1):
             status = "✅" if success else "❌"
-            self.console.print(f"{i:2d}. {status} {original}")
+            lines.append(Text(f"{i:2d}. {status} {original}"))
             if original != command:
-                self.console.print(f"     → {command}", style="dim")
+                lines.append(Text(f"     → {command}", style="dim"))
+        self.console.print(Group(*lines))
+
+    async def list_models(self, refresh: bool = False) -> List[str]:
+        """Return the provider's models, reusing a recently fetched list."""
+        base_url = self.llm_provider.config.base_url
+        if not refresh:
+            models = self.model_cache.get(base_url)
+            if models is not None:
+                return models
+
+        models = await self.llm_provider.list_models()
+        if models:  # An empty list usually means the provider is unreachable
+            self.model_cache.put(base_url, models)
+        return models
 
     async def show_models(self):
         """Show available models."""
         with self.console.status("🔍 Fetching available models..."):
-            models = await self.llm_provider.list_models()
+            models = await self.list_models()
 
         if not models:
             self.console.print(
@@ -619,8 +1012,14 @@ Timeout: {self.llm_provider.config.timeout}s
                     style="red",
                 )
 
-    async def process_user_input(self, user_input: str) -> bool:
-        """Process user input and return whether to continue the session."""
+    async def process_user_input(
+        self, user_input: str, translation: Optional["LLMResponse"] = None
+    ) -> bool:
+        """Process user input and return whether to continue the session.
+
+        A translation fetched beforehand, e.g. with translate_commands(), is
+        used instead of asking the LLM when the input is natural language.
+        """
         user_input = user_input.strip()
 
         if not user_input:
@@ -630,118 +1029,202 @@ Timeout: {self.llm_provider.config.timeout}s
         if user_input.startswith("."):
             result = self._handle_special_command(user_input)
 
-            # Handle async special commands
-            if isinstance(result, str):
-                if result == "async_models":
-                    await self.show_models()
-                    return True
-                elif result.startswith("async_switch_model:"):
-                    model_name = result.split(":", 1)[1]
-                    await self.switch_model(model_name)
-                    return True
-                elif result.startswith("async_suggest:"):
-                    intent = result.split(":", 1)[1]
-                    await self.show_suggestions(intent)
-                    return True
+            # Handlers that need to await return a (kind, payload) request
+            if isinstance(result, tuple):
+                kind, payload = result
+                await self._async_commands[kind](payload)
+                return True
 
             return result
 
-        # Determine command type
-        command_type = self.detect_command_type(user_input)
+        # Tokenize once for detection, cd handling and execution
+        parsed = ParsedInput.parse(user_input)
+        command_type = self.detect_command_type(parsed)
 
         if command_type == "natural" and self.ai_mode:
-            return await self._handle_natural_language(user_input)
+            return await self._handle_natural_language(user_input, translation)
         else:
-            return await self._handle_direct_command(user_input)
+            return await self._handle_direct_command(parsed)
+
+    async def process_user_inputs(
+        self, inputs: List[str], max_parallel: int = 4
+    ) -> bool:
+        """Process a batch of inputs and return whether to continue the session.
+
+        Runs of consecutive natural language inputs are translated concurrently,
+        then handled in order so confirmations and output stay sequential. Dot
+        commands and direct commands can change the directory, its files or the
+        model, so they end a run and the inputs after them are translated
+        against the context as it is once they have finished.
+        """
+        pending: List[str] = []
+        for user_input in inputs:
+            user_input = user_input.strip()
+            if self.is_natural_input(user_input):
+                pending.append(user_input)
+                continue
+
+            if not await self._process_natural_inputs(pending, max_parallel):
+                return False
+            pending = []
+            if not await self.process_user_input(user_input):
+                return False
+
+        return await self._process_natural_inputs(pending, max_parallel)
+
+    def is_natural_input(self, user_input: str) -> bool:
+        """Return whether user_input would be sent to the LLM for translation."""
+        return (
+            self.ai_mode
+            and bool(user_input)
+            and not user_input.startswith(".")
+            and self.detect_command_type(user_input) == "natural"
+        )
+
+    async def _process_natural_inputs(
+        self, inputs: List[str], max_parallel: int
+    ) -> bool:
+        """Translate natural language inputs concurrently, then handle them in order."""
+        if not inputs:
+            return True
 
-    def _handle_special_command(self, command: str) -> bool:
+        unique_inputs = list(dict.fromkeys(inputs))
+        responses = dict(
+            zip(
+                unique_inputs,
+                await self.translate_commands(unique_inputs, max_parallel),
+            )
+        )
+        for user_input in inputs:
+            if not await self._handle_natural_language(
+                user_input, responses[user_input]
+            ):
+                return False
+        return True
+
+    def _handle_special_command(
+        self, command: str
+    ) -> Union[bool, Tuple[str, Optional[str]]]:
         """Handle special dot commands with enhanced features."""
         command_lower = command.lower()
-        parts = command.split()
-
-        if command_lower in [".exit", ".quit", ".q"]:
-            self.console.print("👋 Goodbye!", style="cyan")
-            return False
-        elif command_lower in [".help", ".h"]:
-            self.show_help()
-        elif command_lower == ".mode":
-            self.ai_mode = not self.ai_mode
-            mode = "AI-powered" if self.ai_mode else "Direct bash"
-            self.console.print(f"Switched to {mode} mode", style="yellow")
-        elif command_lower == ".clear":
-            self.console.clear()
-        elif command_lower == ".pwd":
-            self.console.print(str(self.current_directory))
-
-        # Enhanced history commands
-        elif command_lower == ".history":
-            self.history_manager.display_recent_history()
-        elif command_lower == ".history stats":
-            self.history_manager.display_history_stats()
-        elif command_lower.startswith(".history search "):
-            query = command[16:].strip()
-            entries = self.history_manager.search_history(query)
-            if entries:
-                self.console.print(f"🔍 Found {len(entries)} matching commands:")
-                for entry in entries[:10]:
-                    timestamp = entry.timestamp[:10]  # Just the date
-                    self.console.print(
-                        f"  {timestamp}: {entry.user_input} → {entry.translated_command}"
-                    )
-            else:
-                self.console.print(f"No commands found matching '{query}'", style="dim")
-        elif command_lower.startswith(".history export "):
-            filename = command[16:].strip()
-            if self.history_manager.export_history(Path(filename)):
-                self.console.print(f"✅ History exported to {filename}", style="green")
+
+        handler = self._special_commands.get(command_lower)
+        if handler is not None:
+            result = handler()
+        else:
+            for prefix, prefixed_handler in self._prefixed_commands:
+                if command_lower.startswith(prefix):
+                    result = prefixed_handler(command[len(prefix) :].strip())
+                    break
             else:
                 self.console.print(
-                    f"❌ Failed to export history to {filename}", style="red"
+                    f"Unknown command: {command}. Type .help for help.", style="red"
                 )
-        elif command_lower == ".history clear":
-            if Confirm.ask(
-                "Are you sure you want to clear all history?", default=False
-            ):
-                cleared = self.history_manager.clear_history()
+                result = None
+
+        return True if result is None else result
+
+    def _cmd_exit(self) -> bool:
+        """End the session."""
+        self.console.print("👋 Goodbye!", style="cyan")
+        return False
+
+    def _cmd_help(self):
+        """Show help."""
+        self.show_help()
+
+    def _cmd_mode(self):
+        """Toggle between AI and direct mode."""
+        self.ai_mode = not self.ai_mode
+        mode = "AI-powered" if self.ai_mode else "Direct bash"
+        self.console.print(f"Switched to {mode} mode", style="yellow")
+
+    def _cmd_clear(self):
+        """Clear the screen."""
+        self.console.clear()
+
+    def _cmd_pwd(self):
+        """Print the session directory."""
+        self.console.print(str(self.current_directory))
+
+    # Enhanced history commands
+    def _cmd_history(self):
+        """Show recent history."""
+        self.history_manager.display_recent_history()
+
+    def _cmd_history_stats(self):
+        """Show history statistics."""
+        self.history_manager.display_history_stats()
+
+    def _cmd_history_search(self, query: str):
+        """Search history for a term."""
+        # Only the first ten matches are shown, so don't fetch more
+        entries = self.history_manager.search_history(query, limit=10)
+        if entries:
+            self.console.print(f"🔍 Found {len(entries)} matching commands:")
+            for entry in entries:
+                timestamp = entry.timestamp[:10]  # Just the date
                 self.console.print(
-                    f"✅ Cleared {cleared} history entries", style="green"
+                    f"  {timestamp}: {entry.user_input} → {entry.translated_command}"
                 )
-                self.history = []  # Clear in-memory history too
-
-        # Enhanced context commands
-        elif command_lower == ".context":
-            self.show_context()
-        elif command_lower == ".context analyze":
-            self.console.print("🔍 Re-analyzing directory context...")
-            self.current_project_context = self.context_analyzer.analyze_directory(
-                self.current_directory
-            )
-            self.show_context()
-        elif command_lower.startswith(".suggest "):
-            intent = command[9:].strip()
-            return f"async_suggest:{intent}"
-
-        # Model commands (keep existing)
-        elif command_lower == ".models":
-            return "async_models"
-        elif command_lower == ".model":
-            self.show_current_model()
-        elif command_lower.startswith(".model "):
-            model_name = command[7:].strip()
-            return f"async_switch_model:{model_name}"
+        else:
+            self.console.print(f"No commands found matching '{query}'", style="dim")
 
+    def _cmd_history_export(self, filename: str):
+        """Export history to a file."""
+        if self.history_manager.export_history(Path(filename)):
+            self.console.print(f"✅ History exported to {filename}", style="green")
         else:
             self.console.print(
-                f"Unknown command: {command}. Type .help for help.", style="red"
+                f"❌ Failed to export history to {filename}", style="red"
             )
 
-        return True
+    def _cmd_history_clear(self):
+        """Clear all history after confirmation."""
+        if Confirm.ask("Are you sure you want to clear all history?", default=False):
+            cleared = self.history_manager.clear_history()
+            self.console.print(f"✅ Cleared {cleared} history entries", style="green")
+            self.history.clear()  # Clear in-memory history too
+
+    # Enhanced context commands
+    def _cmd_context(self):
+        """Show context information."""
+        self.show_context()
+
+    def _cmd_context_analyze(self):
+        """Re-analyze the current directory."""
+        self.console.print("🔍 Re-analyzing directory context...")
+        self.context_analyzer.invalidate(self.current_directory)
+        self.current_project_context = self.context_analyzer.analyze_directory(
+            self.current_directory
+        )
+        self.show_context()
+
+    def _cmd_suggest(self, intent: str) -> Tuple[str, Optional[str]]:
+        """Defer suggestions to the async handler."""
+        return "suggest", intent
 
-    async def _handle_natural_language(self, user_input: str) -> bool:
-        """Handle natural language input."""
+    # Model commands (keep existing)
+    def _cmd_models(self) -> Tuple[str, Optional[str]]:
+        """Defer model listing to the async handler."""
+        return "models", None
+
+    def _cmd_model(self):
+        """Show the current model."""
+        self.show_current_model()
+
+    def _cmd_switch_model(self, model_name: str) -> Tuple[str, Optional[str]]:
+        """Defer model switching to the async handler."""
+        return "switch_model", model_name
+
+    async def _handle_natural_language(
+        self, user_input: str, response: Optional["LLMResponse"] = None
+    ) -> bool:
+        """Handle natural language input, optionally with an already fetched translation."""
         # Translate to command
-        with self.console.status("🤖 Thinking..."):
-            response = await self.translate_command(user_input)
+        if response is None:
+            with self.console.status("🤖 Thinking..."):
+                response = await self.translate_command(user_input)
 
         if response.error:
             self.console.print(f"❌ Translation error: {response.error}", style="red")
@@ -759,155 +1242,89 @@ Timeout: {self.llm_provider.config.timeout}s
 
         # Handle confirmation based on risk level
         if self.config.execution.always_confirm or risk.requires_confirmation:
-            # Show risk-appropriate warnings
-            if risk.level == DangerLevel.CRITICAL:
-                self.console.print(
-                    "💀 CRITICAL WARNING: This command is extremely dangerous!",
-                    style="bold bright_red",
-                )
-                self.console.print(
-                    "This command could cause irreversible system damage!", style="red"
-                )
-                if not Confirm.ask(
-                    "Type 'I understand the risks' to continue", default=False
-                ):
-                    self.console.print("Command cancelled for safety.", style="yellow")
-                    return True
-                if not Confirm.ask(
-                    "Are you absolutely certain you want to proceed?", default=False
-                ):
-                    self.console.print("Command cancelled.", style="yellow")
-                    return True
-
-            elif risk.level == DangerLevel.HIGH:
-                self.console.print(
-                    "🚨 HIGH RISK: This command could cause significant damage!",
-                    style="bold red",
-                )
-                if not Confirm.ask(
-                    "Are you sure you want to execute this high-risk command?",
-                    default=False,
-                ):
-                    self.console.print("Command cancelled.", style="yellow")
-                    return True
-
-            elif risk.level == DangerLevel.MEDIUM:
-                self.console.print(
-                    "🔶 MODERATE RISK: This command requires careful consideration.",
-                    style="bold orange3",
-                )
-                if not Confirm.ask(
-                    "Proceed with this potentially risky command?", default=True
-                ):
-                    self.console.print("Command cancelled.", style="yellow")
-                    return True
-
-            elif risk.level == DangerLevel.LOW:
-                if not Confirm.ask("Execute this command?", default=True):
-                    self.console.print("Command cancelled.", style="yellow")
-                    return True
-
-            else:  # SAFE
-                if self.config.execution.always_confirm:
-                    if not Confirm.ask("Execute this command?", default=True):
-                        self.console.print("Command cancelled.", style="yellow")
-                        return True
+            if not self._confirm_risk(risk, _NATURAL_CONFIRMATIONS):
+                return True
 
         # Show safety tips if available
         tips = self.safety_analyzer.get_safety_tips(response.command)
         if tips:
-            self.console.print("💡 Safety Tips:", style="bold cyan")
-            for tip in tips:
-                self.console.print(f"  • {tip}", style="cyan")
-            self.console.print("")  # Empty line
+            lines = [_SAFETY_TIPS_HEADER]
+            lines.extend(Text(f"  • {tip}", style="cyan") for tip in tips)
+            lines.append(_BLANK_LINE)
+            self.console.print(Group(*lines))
 
         # Execute command
         success, stdout, stderr = self.execute_command(
-            response.command, user_input, CommandType.NATURAL
+            response.command, user_input, CommandType.NATURAL, stream=True
         )
 
-        # Display output
-        self.display_output(success, stdout, stderr)
+        # Output was streamed while running; only report silent failures
+        self.display_output(success, stdout, stderr, already_shown=True)
+
+        return True
 
+    def _confirm_risk(self, risk: CommandRisk, confirmations: Dict) -> bool:
+        """Print the warnings for the risk level and ask its prompts in turn."""
+        warnings, prompts = confirmations[risk.level]
+        for warning in warnings:
+            self.console.print(warning)
+        for prompt, default, cancelled in prompts:
+            if not Confirm.ask(prompt, default=default):
+                self.console.print(cancelled, style="yellow")
+                return False
         return True
 
-    async def _handle_direct_command(self, command: str) -> bool:
+    async def _handle_direct_command(self, command: Union[str, ParsedInput]) -> bool:
         """Handle direct command input."""
+        parsed = (
+            command if isinstance(command, ParsedInput) else ParsedInput.parse(command)
+        )
+        command = parsed.raw
+
         # Analyze command safety
         risk = self.analyze_command_safety(command)
 
         # Check for dangerous commands in safe mode
         if self.config.execution.safe_mode and risk.requires_confirmation:
             # Display risk information for direct commands too
-            if risk.level >= DangerLevel.MEDIUM:
-                emoji = get_danger_level_emoji(risk.level)
-                level_name = risk.level.name.title()
-                color = get_danger_level_color(risk.level)
-
-                self.console.print(
-                    f"{emoji} {level_name} Risk Command Detected!",
-                    style=f"bold {color}",
-                )
+            header = _RISK_DETECTED_HEADERS.get(risk.level)
+            if header is not None:
+                lines = [header]
 
                 if risk.reasons:
-                    self.console.print("⚠️  Safety Concerns:", style="bold yellow")
-                    for reason in risk.reasons:
-                        self.console.print(f"  • {reason}", style="yellow")
+                    lines.append(_SAFETY_CONCERNS_HEADER)
+                    lines.extend(
+                        Text(f"  • {reason}", style="yellow") for reason in risk.reasons
+                    )
 
                 if risk.suggestions:
-                    self.console.print("💡 Suggestions:", style="bold cyan")
-                    for suggestion in risk.suggestions:
-                        self.console.print(f"  • {suggestion}", style="cyan")
+                    lines.append(_SUGGESTIONS_HEADER)
+                    lines.extend(
+                        Text(f"  • {suggestion}", style="cyan")
+                        for suggestion in risk.suggestions
+                    )
 
-                self.console.print()  # Empty line
+                lines.append(_BLANK_LINE)
+                self.console.print(Group(*lines))
 
             # Risk-based confirmation
-            if risk.level == DangerLevel.CRITICAL:
-                self.console.print(
-                    "💀 CRITICAL WARNING: This command is extremely dangerous!",
-                    style="bold bright_red",
-                )
-                if not Confirm.ask(
-                    "Are you absolutely certain you want to proceed?", default=False
-                ):
-                    self.console.print("Command cancelled for safety.", style="yellow")
-                    return True
-            elif risk.level == DangerLevel.HIGH:
-                self.console.print(
-                    "🚨 HIGH RISK: This command could cause significant damage!",
-                    style="bold red",
-                )
-                if not Confirm.ask(
-                    "Are you sure you want to execute this high-risk command?",
-                    default=False,
-                ):
-                    self.console.print("Command cancelled.", style="yellow")
-                    return True
-            elif risk.level == DangerLevel.MEDIUM:
-                if not Confirm.ask(
-                    "Proceed with this potentially risky command?", default=False
-                ):
-                    self.console.print("Command cancelled.", style="yellow")
-                    return True
-            else:  # LOW risk
-                if not Confirm.ask(
-                    "Are you sure you want to execute this command?", default=True
-                ):
-                    self.console.print("Command cancelled.", style="yellow")
-                    return True
+            if not self._confirm_risk(risk, _DIRECT_CONFIRMATIONS):
+                return True
 
         # Execute command
         success, stdout, stderr = self.execute_command(
-            command, command, CommandType.DIRECT
+            parsed, command, CommandType.DIRECT, stream=True
         )
 
-        # Display output
-        self.display_output(success, stdout, stderr)
+        # Output was streamed while running; only report silent failures
+        self.display_output(success, stdout, stderr, already_shown=True)
 
         return True
 
 
-async def start_interactive_shell(config: LLMShellConfig, llm_provider: LLMProvider):
+async def start_interactive_shell(
+    config: "LLMShellConfig", llm_provider: "LLMProvider"
+):
     """Start the interactive shell session."""
     console = Console()
 
@@ -952,4 +1369,7 @@ async def start_interactive_shell(config: LLMShellConfig, llm_provider: LLMProvi
     except Exception as e:
         console.print(f"❌ Unexpected error: {e}", style="red")
     finally:
-        llm_provider.close()
+        session.history_manager.close()
+        if session.persistent_shell is not None:
+            session.persistent_shell.close()
+        await llm_provider.close()
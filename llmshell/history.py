@@ -1,8 +1,12 @@
 """Enhanced history management for LLMShell."""
 
+import atexit
 import json
+import queue
 import sqlite3
-from dataclasses import asdict, dataclass
+import threading
+import time
+from dataclasses import dataclass, fields
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
@@ -12,6 +16,64 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 
+# Applied to the connection: WAL lets readers run alongside the writer and
+# NORMAL sync stays durable in WAL mode while skipping an fsync per commit
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+)
+
+# The background writer batches entries queued within this many seconds of
+# each other, up to a maximum batch size, into one transaction
+_WRITE_WINDOW = 0.1
+_WRITE_BATCH_SIZE = 100
+
+# Full-text index over the searchable columns, kept in sync by triggers. The
+# trigram tokenizer matches arbitrary substrings of three or more characters,
+# so it answers the same questions as LIKE '%...%' without scanning the table
+_SEARCH_INDEX_SQL = (
+    """
+    CREATE VIRTUAL TABLE history_fts USING fts5(
+        user_input, translated_command,
+        content='command_history', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER history_fts_insert AFTER INSERT ON command_history BEGIN
+        INSERT INTO history_fts(rowid, user_input, translated_command)
+        VALUES (new.id, new.user_input, new.translated_command);
+    END
+    """,
+    """
+    CREATE TRIGGER history_fts_delete AFTER DELETE ON command_history BEGIN
+        INSERT INTO history_fts(history_fts, rowid, user_input, translated_command)
+        VALUES ('delete', old.id, old.user_input, old.translated_command);
+    END
+    """,
+    """
+    CREATE TRIGGER history_fts_update AFTER UPDATE ON command_history BEGIN
+        INSERT INTO history_fts(history_fts, rowid, user_input, translated_command)
+        VALUES ('delete', old.id, old.user_input, old.translated_command);
+        INSERT INTO history_fts(rowid, user_input, translated_command)
+        VALUES (new.id, new.user_input, new.translated_command);
+    END
+    """,
+    # Index whatever was recorded before the index existed
+    "INSERT INTO history_fts(history_fts) VALUES ('rebuild')",
+)
+
+# The trigram index cannot match anything shorter than this
+_MIN_SEARCH_LENGTH = 3
+
+_INSERT_SQL = """
+    INSERT INTO command_history (
+        timestamp, user_input, translated_command, command_type,
+        success, execution_time_ms, working_directory, exit_code,
+        error_message, model_used, session_id, project_context
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 
 class CommandType(Enum):
     """Type of command executed."""
@@ -21,7 +83,7 @@ class CommandType(Enum):
     SPECIAL = "special"
 
 
-@dataclass
+@dataclass(slots=True)
 class HistoryEntry:
     """A single history entry with rich metadata."""
 
@@ -44,6 +106,63 @@ class HistoryEntry:
             self.timestamp = datetime.now(timezone.utc).isoformat()
 
 
+# Selected explicitly, in field order, so rows can build entries positionally
+_ENTRY_FIELDS = tuple(field.name for field in fields(HistoryEntry))
+_ENTRY_COLUMNS = ", ".join(f"command_history.{name}" for name in _ENTRY_FIELDS)
+
+# Upper bound on the number of entries written by export_history
+_EXPORT_LIMIT = 10000
+
+# Successful commands matching a condition, most used first. Usage counts are
+# aggregated once instead of per matching row
+_SIMILAR_SQL = """
+    WITH usage AS (
+        SELECT translated_command, COUNT(*) AS usage_count
+        FROM command_history
+        WHERE success = 1
+        GROUP BY translated_command
+    )
+    SELECT {columns}
+    FROM command_history
+    JOIN usage USING (translated_command)
+    WHERE ({matching})
+    AND success = 1
+    AND command_type != 'special'
+    ORDER BY usage.usage_count DESC, command_history.timestamp DESC
+    LIMIT ?
+"""
+# With the search index every lookup is the same statement, so it is built
+# once and stays in the connection's statement cache
+_SIMILAR_INDEXED_SQL = _SIMILAR_SQL.format(
+    columns=_ENTRY_COLUMNS,
+    matching="id IN (SELECT rowid FROM history_fts WHERE history_fts MATCH ?)",
+)
+_SIMILAR_LIKE_TERM = "(user_input LIKE ? OR translated_command LIKE ?)"
+
+
+def _match_phrase(text: str) -> str:
+    """Quote text as a single FTS5 phrase."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _entry_row(entry: HistoryEntry) -> tuple:
+    """Return the INSERT parameters for an entry."""
+    return (
+        entry.timestamp,
+        entry.user_input,
+        entry.translated_command,
+        entry.command_type,
+        entry.success,
+        entry.execution_time_ms,
+        entry.working_directory,
+        entry.exit_code,
+        entry.error_message,
+        entry.model_used,
+        entry.session_id,
+        entry.project_context,
+    )
+
+
 class HistoryManager:
     """Enhanced history management with persistence and analytics."""
 
@@ -54,12 +173,25 @@ class HistoryManager:
         self.db_path = self.data_dir / "history.db"
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.console = Console()
+        self._write_queue: "queue.Queue[Optional[HistoryEntry]]" = queue.Queue()
+        self._write_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+
+        # One connection for the lifetime of the manager; opening one per
+        # query cost more than the tiny queries themselves
+        # Rows are plain tuples unpacked straight into HistoryEntry; a
+        # sqlite3.Row per result would only be thrown away again
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for pragma in _CONNECTION_PRAGMAS:
+            self._conn.execute(pragma)
 
         self._init_database()
+        atexit.register(self._flush_at_exit)
 
     def _init_database(self):
         """Initialize the SQLite database for history storage."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn as conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS command_history (
@@ -86,9 +218,21 @@ class HistoryManager:
             """
             )
 
+            # Session lookups come back already in timestamp order; this
+            # supersedes the session_id-only index of earlier versions
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_session_ts
+                ON command_history(session_id, timestamp)
+            """
+            )
+            conn.execute("DROP INDEX IF EXISTS idx_session")
+
+            # Covers the per-command usage counts without touching the table
             conn.execute(
                 """
-                CREATE INDEX IF NOT EXISTS idx_session ON command_history(session_id)
+                CREATE INDEX IF NOT EXISTS idx_command_success
+                ON command_history(translated_command, success)
             """
             )
 
@@ -98,56 +242,128 @@ class HistoryManager:
             """
             )
 
+        self._search_index = self._init_search_index()
+
+    def _init_search_index(self) -> bool:
+        """Create the full-text search index, returning whether it is usable."""
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'history_fts'"
+        ).fetchone()
+        if exists:
+            return True
+
+        try:
+            with self._conn as conn:
+                for statement in _SEARCH_INDEX_SQL:
+                    conn.execute(statement)
+        except sqlite3.OperationalError:
+            return False  # SQLite built without FTS5 or trigram; use LIKE scans
+        return True
+
     def add_entry(self, entry: HistoryEntry) -> int:
         """Add a new history entry and return its ID."""
+        self.flush()
         entry.session_id = self.session_id
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                """
-                INSERT INTO command_history (
-                    timestamp, user_input, translated_command, command_type,
-                    success, execution_time_ms, working_directory, exit_code,
-                    error_message, model_used, session_id, project_context
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    entry.timestamp,
-                    entry.user_input,
-                    entry.translated_command,
-                    entry.command_type,
-                    entry.success,
-                    entry.execution_time_ms,
-                    entry.working_directory,
-                    entry.exit_code,
-                    entry.error_message,
-                    entry.model_used,
-                    entry.session_id,
-                    entry.project_context,
-                ),
-            )
+        with self._write_lock, self._conn as conn:
+            cursor = conn.execute(_INSERT_SQL, _entry_row(entry))
             entry.id = cursor.lastrowid
             return entry.id
 
+    def add_entries_bulk(self, entries: List[HistoryEntry]) -> int:
+        """Add several history entries in one transaction and return how many."""
+        for entry in entries:
+            entry.session_id = self.session_id
+
+        with self._write_lock, self._conn as conn:
+            conn.executemany(_INSERT_SQL, [_entry_row(entry) for entry in entries])
+        return len(entries)
+
+    def queue_entry(self, entry: HistoryEntry):
+        """Hand an entry to the background writer and return immediately.
+
+        Queued entries are flushed before any read and when the manager closes.
+        Entries queued after close() are dropped.
+        """
+        if self._closed:
+            return
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="llmshell-history", daemon=True
+            )
+            self._writer.start()
+        self._write_queue.put(entry)
+
+    def _writer_loop(self):
+        """Write queued entries in batches until the stop sentinel arrives."""
+        running = True
+        while running:
+            batch = [self._write_queue.get()]
+            deadline = time.monotonic() + _WRITE_WINDOW
+            while len(batch) < _WRITE_BATCH_SIZE and batch[-1] is not None:
+                try:
+                    batch.append(
+                        self._write_queue.get(
+                            timeout=max(deadline - time.monotonic(), 0)
+                        )
+                    )
+                except queue.Empty:
+                    break
+
+            if batch[-1] is None:
+                running = False
+            entries = [entry for entry in batch if entry is not None]
+            try:
+                if entries:
+                    self.add_entries_bulk(entries)
+            except sqlite3.Error:
+                pass  # History is best effort; never take the shell down
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+
+    def flush(self):
+        """Wait until every queued entry has been written."""
+        if self._writer is not None:
+            self._write_queue.join()
+
+    def close(self):
+        """Write queued entries, stop the writer and close the connection."""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self._flush_at_exit)
+        try:
+            if self._writer is not None:
+                self._write_queue.put(None)
+                self._writer.join()
+                self._writer = None
+            # Refresh planner statistics for the indexes when they are stale
+            self._conn.execute("PRAGMA optimize")
+        finally:
+            self._conn.close()
+
+    def _flush_at_exit(self):
+        """Close at interpreter exit without failing if storage is gone."""
+        try:
+            self.close()
+        except (sqlite3.Error, OSError):
+            pass
+
     def get_recent_entries(self, limit: int = 50) -> List[HistoryEntry]:
         """Get recent history entries."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        self.flush()
+        with self._conn as conn:
             cursor = conn.execute(
-                """
-                SELECT * FROM command_history 
+                f"""
+                SELECT {_ENTRY_COLUMNS} FROM command_history 
                 ORDER BY timestamp DESC 
                 LIMIT ?
             """,
                 (limit,),
             )
 
-            entries = []
-            for row in cursor.fetchall():
-                entry = HistoryEntry(**dict(row))
-                entries.append(entry)
-
-            return entries
+            return [HistoryEntry(*row) for row in cursor]
 
     def get_session_history(
         self, session_id: Optional[str] = None
@@ -155,171 +371,170 @@ class HistoryManager:
         """Get history for a specific session."""
         session_id = session_id or self.session_id
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        self.flush()
+        with self._conn as conn:
             cursor = conn.execute(
-                """
-                SELECT * FROM command_history 
+                f"""
+                SELECT {_ENTRY_COLUMNS} FROM command_history 
                 WHERE session_id = ?
                 ORDER BY timestamp ASC
             """,
                 (session_id,),
             )
 
-            entries = []
-            for row in cursor.fetchall():
-                entry = HistoryEntry(**dict(row))
-                entries.append(entry)
-
-            return entries
+            return [HistoryEntry(*row) for row in cursor]
 
     def search_history(self, query: str, limit: int = 20) -> List[HistoryEntry]:
         """Search history by command content."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(
-                """
-                SELECT * FROM command_history 
-                WHERE user_input LIKE ? OR translated_command LIKE ?
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            """,
-                (f"%{query}%", f"%{query}%", limit),
-            )
-
-            entries = []
-            for row in cursor.fetchall():
-                entry = HistoryEntry(**dict(row))
-                entries.append(entry)
+        self.flush()
+        with self._conn as conn:
+            if self._search_index and len(query) >= _MIN_SEARCH_LENGTH:
+                cursor = conn.execute(
+                    f"""
+                    SELECT {_ENTRY_COLUMNS} FROM command_history
+                    JOIN history_fts ON history_fts.rowid = command_history.id
+                    WHERE history_fts MATCH ?
+                    ORDER BY command_history.timestamp DESC
+                    LIMIT ?
+                """,
+                    (_match_phrase(query), limit),
+                )
+            else:
+                cursor = conn.execute(
+                    f"""
+                    SELECT {_ENTRY_COLUMNS} FROM command_history 
+                    WHERE user_input LIKE ? OR translated_command LIKE ?
+                    ORDER BY timestamp DESC 
+                    LIMIT ?
+                """,
+                    (f"%{query}%", f"%{query}%", limit),
+                )
 
-            return entries
+            return [HistoryEntry(*row) for row in cursor]
 
     def get_command_stats(self) -> Dict[str, Any]:
         """Get statistics about command usage."""
-        with sqlite3.connect(self.db_path) as conn:
-            # Total commands
-            total = conn.execute("SELECT COUNT(*) FROM command_history").fetchone()[0]
-
-            # Success rate
-            successful = conn.execute(
-                "SELECT COUNT(*) FROM command_history WHERE success = 1"
-            ).fetchone()[0]
-            success_rate = (successful / total * 100) if total > 0 else 0
-
-            # Command types
-            type_stats = {}
-            cursor = conn.execute(
-                "SELECT command_type, COUNT(*) FROM command_history GROUP BY command_type"
-            )
-            for row in cursor.fetchall():
-                type_stats[row[0]] = row[1]
-
-            # Most used commands
-            cursor = conn.execute(
+        self.flush()
+        with self._conn as conn:
+            # One round trip: totals and success counts come from the per-type
+            # grouping, the lists come back as JSON arrays
+            types_json, popular_json, recent_json = conn.execute(
                 """
-                SELECT translated_command, COUNT(*) as count 
-                FROM command_history 
-                WHERE command_type != 'special'
-                GROUP BY translated_command 
-                ORDER BY count DESC 
-                LIMIT 10
+                WITH types AS (
+                    SELECT command_type, COUNT(*) AS count, SUM(success) AS successful
+                    FROM command_history
+                    GROUP BY command_type
+                ), popular AS (
+                    SELECT translated_command, COUNT(*) AS count
+                    FROM command_history
+                    WHERE command_type != 'special'
+                    GROUP BY translated_command
+                    ORDER BY count DESC
+                    LIMIT 10
+                ), recent AS (
+                    SELECT DATE(timestamp) AS date, COUNT(*) AS count
+                    FROM command_history
+                    WHERE timestamp >= datetime('now', '-7 days')
+                    GROUP BY DATE(timestamp)
+                )
+                SELECT
+                    (SELECT json_group_array(
+                        json_array(command_type, count, successful))
+                     FROM types),
+                    (SELECT json_group_array(
+                        json_object('command', translated_command, 'count', count))
+                     FROM popular),
+                    (SELECT json_group_array(json_object('date', date, 'count', count))
+                     FROM recent)
             """
-            )
-            popular_commands = [
-                {"command": row[0], "count": row[1]} for row in cursor.fetchall()
-            ]
+            ).fetchone()
 
-            # Recent activity (last 7 days)
-            cursor = conn.execute(
-                """
-                SELECT DATE(timestamp) as date, COUNT(*) as count
-                FROM command_history 
-                WHERE timestamp >= datetime('now', '-7 days')
-                GROUP BY DATE(timestamp)
-                ORDER BY date DESC
-            """
-            )
-            recent_activity = [
-                {"date": row[0], "count": row[1]} for row in cursor.fetchall()
-            ]
-
-            return {
-                "total_commands": total,
-                "success_rate": round(success_rate, 1),
-                "command_types": type_stats,
-                "popular_commands": popular_commands,
-                "recent_activity": recent_activity,
-            }
+        types = json.loads(types_json)
+        type_stats = {command_type: count for command_type, count, _ in types}
+        total = sum(type_stats.values())
+        successful = sum(successful for _, _, successful in types)
+        success_rate = (successful / total * 100) if total > 0 else 0
+
+        # json_group_array does not promise to keep the subquery order
+        popular_commands = sorted(
+            json.loads(popular_json), key=lambda item: item["count"], reverse=True
+        )
+        recent_activity = sorted(
+            json.loads(recent_json), key=lambda item: item["date"], reverse=True
+        )
+
+        return {
+            "total_commands": total,
+            "success_rate": round(success_rate, 1),
+            "command_types": type_stats,
+            "popular_commands": popular_commands,
+            "recent_activity": recent_activity,
+        }
 
     def get_similar_commands(
         self, user_input: str, limit: int = 5
     ) -> List[HistoryEntry]:
         """Find similar commands based on user input."""
-        # Simple similarity: look for commands with shared words
-        words = user_input.lower().split()
+        # Simple similarity: look for commands with shared words,
+        # skipping very short ones
+        words = [word for word in user_input.lower().split() if len(word) > 2]
         if not words:
             return []
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-
-            # Build a query that looks for any of the words
-            query_parts = []
-            params = []
-            for word in words:
-                if len(word) > 2:  # Skip very short words
-                    query_parts.append(
-                        "(user_input LIKE ? OR translated_command LIKE ?)"
-                    )
-                    params.extend([f"%{word}%", f"%{word}%"])
-
-            if not query_parts:
-                return []
-
-            query = f"""
-                SELECT *, 
-                       (SELECT COUNT(*) FROM command_history ch2 
-                        WHERE ch2.translated_command = command_history.translated_command 
-                        AND ch2.success = 1) as usage_count
-                FROM command_history 
-                WHERE ({' OR '.join(query_parts)})
-                AND success = 1
-                AND command_type != 'special'
-                ORDER BY usage_count DESC, timestamp DESC
-                LIMIT ?
-            """
+        self.flush()
+        with self._conn as conn:
+            # Look for any of the words
+            if self._search_index:
+                query = _SIMILAR_INDEXED_SQL
+                params = [" OR ".join(_match_phrase(word) for word in words)]
+            else:
+                query = _SIMILAR_SQL.format(
+                    columns=_ENTRY_COLUMNS,
+                    matching=" OR ".join([_SIMILAR_LIKE_TERM] * len(words)),
+                )
+                params = [f"%{word}%" for word in words for _ in range(2)]
             params.append(limit)
 
             cursor = conn.execute(query, params)
-            entries = []
-            for row in cursor.fetchall():
-                entry = HistoryEntry(
-                    **{k: v for k, v in dict(row).items() if k != "usage_count"}
-                )
-                entries.append(entry)
-
-            return entries
+            return [HistoryEntry(*row) for row in cursor]
 
     def export_history(self, output_file: Path, format: str = "json") -> bool:
         """Export history to file."""
+        if format not in ("json", "csv"):
+            return False
+
         try:
-            entries = self.get_recent_entries(limit=10000)  # Export all recent
+            self.flush()
+            # Rows are streamed from the cursor to the file, so memory use does
+            # not grow with the size of the export
+            rows = self._conn.execute(
+                f"""
+                SELECT {_ENTRY_COLUMNS} FROM command_history
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """,
+                (_EXPORT_LIMIT,),
+            )
 
             if format == "json":
-                data = [asdict(entry) for entry in entries]
                 with open(output_file, "w") as f:
-                    json.dump(data, f, indent=2)
-            elif format == "csv":
+                    # Same layout as json.dump(entries, f, indent=2)
+                    separator = "[\n"
+                    for row in rows:
+                        item = json.dumps(dict(zip(_ENTRY_FIELDS, row)), indent=2)
+                        f.write(separator + "  " + item.replace("\n", "\n  "))
+                        separator = ",\n"
+                    f.write("[]" if separator == "[\n" else "\n]")
+            else:
                 import csv
 
                 with open(output_file, "w", newline="") as f:
-                    if entries:
-                        writer = csv.DictWriter(f, fieldnames=asdict(entries[0]).keys())
-                        writer.writeheader()
-                        for entry in entries:
-                            writer.writerow(asdict(entry))
-            else:
-                return False
+                    first = next(rows, None)
+                    if first is not None:
+                        writer = csv.writer(f)
+                        writer.writerow(_ENTRY_FIELDS)
+                        writer.writerow(first)
+                        writer.writerows(rows)
 
             return True
         except Exception:
@@ -327,7 +542,8 @@ class HistoryManager:
 
     def clear_history(self, older_than_days: Optional[int] = None) -> int:
         """Clear history, optionally only entries older than specified days."""
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+        with self._conn as conn:
             if older_than_days:
                 cursor = conn.execute(
                     """
@@ -400,8 +616,8 @@ Command Types:"""
         table.add_column("Status", width=6)
 
         for i, entry in enumerate(reversed(entries), 1):
-            timestamp = datetime.fromisoformat(entry.timestamp.replace("Z", "+00:00"))
-            time_str = timestamp.strftime("%H:%M:%S")
+            # ISO 8601 timestamps keep the time of day at a fixed offset
+            time_str = entry.timestamp[11:19]
             status = "✅" if entry.success else "❌"
 
             # Truncate long inputs/commands
@@ -1,6 +1,10 @@
 """LLM integration for translating natural language to bash commands."""
 
+import asyncio
+import importlib.util
 import json
+import re
+import weakref
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
@@ -8,6 +12,75 @@ import httpx
 
 from .config import LLMConfig
 
+# orjson is an optional speedup; both encoders produce JSON httpx can send
+# as-is, and orjson's decode errors subclass json.JSONDecodeError
+try:
+    from orjson import dumps as _json_dumps
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import dumps as _json_dumps
+    from json import loads as _json_loads
+
+# httpx only negotiates HTTP/2 when the optional h2 package is installed
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Shared clients keyed by event loop, then by timeout
+_shared_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+# Instructions sent ahead of every translation request
+_SYSTEM_PROMPT = """You are a Linux/Unix shell command translator. Your job is to convert natural language descriptions into precise, safe bash commands.
+
+Rules:
+1. Return ONLY the bash command, nothing else
+2. Do not include explanations unless specifically asked
+3. Use the most common and portable Unix commands
+4. Prefer safer options when multiple approaches exist
+5. If the request is unclear or potentially dangerous, suggest the safest interpretation
+6. Do not execute or simulate command execution
+7. Focus on commonly available commands (bash, coreutils, findutils, etc.)
+
+Examples:
+"list all files" -> ls -la
+"find python files" -> find . -name "*.py"
+"show disk usage" -> df -h
+"show running processes" -> ps aux"""
+
+# Every prompt starts with the system prompt; only the tail varies per request
+_PROMPT_PREFIX = _SYSTEM_PROMPT + "\n\n"
+
+
+# Markdown fence lines, and comment lines that are only dropped outside fences
+_FENCE_LINE_RE = re.compile(r"^[^\S\n]*```.*(?:\n|$)", re.MULTILINE)
+_COMMENT_LINE_RE = re.compile(r"^#.*(?:\n|$)", re.MULTILINE)
+
+
+def _strip_code_fences(text: str) -> str:
+    """Return the text without fence lines or comments outside code blocks."""
+    # Splitting on fence lines alternates outside and inside segments
+    segments = _FENCE_LINE_RE.split(text)
+    segments[::2] = [_COMMENT_LINE_RE.sub("", segment) for segment in segments[::2]]
+    return "".join(segments).strip()
+
+
+# A first line ending in one of these continues on the next line
+_LINE_CONTINUATIONS = ("\\", "&&", "|")
+
+
+def _complete_reply(text: str) -> Optional[str]:
+    """Return the part of a partial reply that already holds the command, if any.
+
+    A fenced reply is complete at its closing fence; otherwise the first
+    finished line is the command unless it continues on the next line.
+    """
+    if "```" in text:
+        return text if text.count("```") >= 2 else None
+
+    first_line, newline, _ = text.lstrip().partition("\n")
+    first_line = first_line.rstrip()
+    if newline and first_line and not first_line.endswith(_LINE_CONTINUATIONS):
+        return first_line
+    return None
+
 
 @dataclass
 class LLMResponse:
@@ -19,12 +92,52 @@ class LLMResponse:
     error: Optional[str] = None
 
 
+def _build_http_client(timeout: float) -> httpx.AsyncClient:
+    """Create an async HTTP client with keep-alive pooling and HTTP/2 if available."""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout, connect=5.0),
+        # Users pause between prompts for far longer than a few seconds, so
+        # idle connections are kept long enough to survive that think time
+        limits=httpx.Limits(
+            max_keepalive_connections=8,
+            max_connections=40,
+            keepalive_expiry=300.0,
+        ),
+        http2=_HTTP2_AVAILABLE,
+    )
+
+
+def get_shared_http_client(timeout: float) -> httpx.AsyncClient:
+    """Return an HTTP client shared by providers on the running event loop.
+
+    Async clients are tied to the loop they were first used on, so one is
+    kept per loop; close them with close_shared_http_clients() before the
+    loop ends.
+    """
+    clients = _shared_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(timeout)
+    if client is None or client.is_closed:
+        client = clients[timeout] = _build_http_client(timeout)
+    return client
+
+
+async def close_shared_http_clients():
+    """Close the shared HTTP clients of the running event loop."""
+    clients = _shared_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
 class LLMProvider:
     """Base class for LLM providers."""
 
-    def __init__(self, config: LLMConfig):
+    def __init__(
+        self, config: LLMConfig, http_client: Optional[httpx.AsyncClient] = None
+    ):
         self.config = config
-        self.client = httpx.Client(timeout=config.timeout)
+        # Only close clients we created; shared clients outlive the provider
+        self._owns_client = http_client is None
+        self.client = http_client or _build_http_client(config.timeout)
 
     async def translate(
         self, natural_language: str, context: Optional[Dict[str, Any]] = None
@@ -40,56 +153,43 @@ class LLMProvider:
         """Test if the provider is accessible."""
         raise NotImplementedError
 
-    def close(self):
-        """Close the HTTP client."""
-        self.client.close()
+    async def close(self):
+        """Close the HTTP client if this provider owns it."""
+        if self._owns_client:
+            await self.client.aclose()
 
 
 class OllamaProvider(LLMProvider):
     """Ollama LLM provider for local model inference."""
 
-    def __init__(self, config: LLMConfig):
-        super().__init__(config)
+    def __init__(
+        self, config: LLMConfig, http_client: Optional[httpx.AsyncClient] = None
+    ):
+        super().__init__(config, http_client)
         self.base_url = config.base_url.rstrip("/")
 
     def _build_prompt(
         self, natural_language: str, context: Optional[Dict[str, Any]] = None
     ) -> str:
         """Build the prompt for the LLM."""
-        system_prompt = """You are a Linux/Unix shell command translator. Your job is to convert natural language descriptions into precise, safe bash commands.
-
-Rules:
-1. Return ONLY the bash command, nothing else
-2. Do not include explanations unless specifically asked
-3. Use the most common and portable Unix commands
-4. Prefer safer options when multiple approaches exist
-5. If the request is unclear or potentially dangerous, suggest the safest interpretation
-6. Do not execute or simulate command execution
-7. Focus on commonly available commands (bash, coreutils, findutils, etc.)
-
-Examples:
-"list all files" -> ls -la
-"find python files" -> find . -name "*.py"
-"show disk usage" -> df -h
-"show running processes" -> ps aux"""
-
-        context_info = ""
+        parts = [_PROMPT_PREFIX]
         if context:
+            context_lines = []
             if "cwd" in context:
-                context_info += f"Current directory: {context['cwd']}\n"
+                context_lines.append(f"Current directory: {context['cwd']}\n")
             if "user" in context:
-                context_info += f"Current user: {context['user']}\n"
+                context_lines.append(f"Current user: {context['user']}\n")
             if "files" in context:
-                context_info += (
+                context_lines.append(
                     f"Files in current directory: {', '.join(context['files'][:10])}\n"
                 )
+            if context_lines:
+                parts.append("Context:\n")
+                parts.extend(context_lines)
+                parts.append("\n")
+        parts.append(f"Human request: {natural_language}\nBash command:")
 
-        prompt = f"{system_prompt}\n\n"
-        if context_info:
-            prompt += f"Context:\n{context_info}\n"
-        prompt += f"Human request: {natural_language}\nBash command:"
-
-        return prompt
+        return "".join(parts)
 
     async def translate(
         self, natural_language: str, context: Optional[Dict[str, Any]] = None
@@ -101,7 +201,7 @@ Examples:
             payload = {
                 "model": self.config.model,
                 "prompt": prompt,
-                "stream": False,
+                "stream": True,
                 "options": {
                     "temperature": self.config.temperature,
                 },
@@ -110,42 +210,52 @@ Examples:
             if self.config.max_tokens:
                 payload["options"]["num_predict"] = self.config.max_tokens
 
-            response = self.client.post(
+            # The reply is streamed so reading can stop as soon as the command
+            # is complete; closing the response early also stops generation
+            async with self.client.stream(
+                "POST",
                 f"{self.base_url}/api/generate",
-                json=payload,
+                content=_json_dumps(payload),
                 headers={"Content-Type": "application/json"},
-            )
-
-            if response.status_code != 200:
-                return LLMResponse(
-                    command="",
-                    error=f"Ollama API error: {response.status_code} - {response.text}",
-                )
-
-            result = response.json()
-            command = result.get("response", "").strip()
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    error = f"{response.status_code} - {response.text}"
+                    return LLMResponse(command="", error=f"Ollama API error: {error}")
+
+                tokens = []
+                command = None
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = _json_loads(line)
+                    if "error" in chunk:
+                        return LLMResponse(
+                            command="", error=f"Ollama API error: {chunk['error']}"
+                        )
+
+                    token = chunk.get("response", "")
+                    tokens.append(token)
+                    if chunk.get("done"):
+                        break
+                    if "\n" in token:
+                        command = _complete_reply("".join(tokens))
+                        if command is not None:
+                            break
+
+            if command is None:
+                command = "".join(tokens)
+            command = command.strip()
 
             # Clean up the command - remove any markdown formatting or explanations
             if "```" in command:
-                # Extract command from code blocks
-                lines = command.split("\n")
-                command_lines = []
-                in_code_block = False
-                for line in lines:
-                    if line.strip().startswith("```"):
-                        in_code_block = not in_code_block
-                        continue
-                    if in_code_block or (
-                        not in_code_block and not line.startswith("#")
-                    ):
-                        command_lines.append(line)
-                command = "\n".join(command_lines).strip()
+                command = _strip_code_fences(command)
 
             # Take only the first line if multiple lines (unless it's a proper multi-line command)
             if "\n" in command and not any(
                 op in command for op in ["&&", "||", "|", "\\"]
             ):
-                command = command.split("\n")[0].strip()
+                command = command.partition("\n")[0].strip()
 
             return LLMResponse(
                 command=command,
@@ -166,10 +276,10 @@ Examples:
     async def list_models(self) -> list[str]:
         """List available Ollama models."""
         try:
-            response = self.client.get(f"{self.base_url}/api/tags")
+            response = await self.client.get(f"{self.base_url}/api/tags")
             response.raise_for_status()
 
-            data = response.json()
+            data = _json_loads(response.content)
             models = []
             for model in data.get("models", []):
                 if "name" in model:
@@ -184,16 +294,18 @@ Examples:
     async def test_connection(self) -> bool:
         """Test if Ollama is accessible."""
         try:
-            response = self.client.get(f"{self.base_url}/api/tags")
+            response = await self.client.get(f"{self.base_url}/api/tags")
             return response.status_code == 200
         except Exception:
             return False
 
 
-def create_llm_provider(config: LLMConfig) -> LLMProvider:
+def create_llm_provider(
+    config: LLMConfig, http_client: Optional[httpx.AsyncClient] = None
+) -> LLMProvider:
     """Factory function to create appropriate LLM provider."""
     if config.provider.lower() == "ollama":
-        return OllamaProvider(config)
+        return OllamaProvider(config, http_client)
     else:
         raise ValueError(f"Unsupported LLM provider: {config.provider}")
 
@@ -205,8 +317,6 @@ async def test_llm_connection(provider: LLMProvider) -> bool:
 
 if __name__ == "__main__":
     # Example usage
-    import asyncio
-
     from .config import LLMConfig
 
     async def main():
@@ -226,6 +336,6 @@ if __name__ == "__main__":
         else:
             print("✗ LLM connection failed")
 
-        provider.close()
+        await provider.close()
 
     asyncio.run(main())
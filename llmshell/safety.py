@@ -2,13 +2,95 @@
 
 import re
 import shlex
-from enum import Enum
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+from enum import IntEnum
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+# Hyperscan is an optional speedup that matches every rule in a single pass;
+# without it each danger level is scanned with the re module
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Read-only commands that stay safe with any arguments as long as nothing is
+# chained, redirected or substituted; these skip the pattern scan entirely
+_SAFE_COMMANDS = frozenset(
+    {
+        "cal",
+        "cat",
+        "date",
+        "df",
+        "du",
+        "echo",
+        "free",
+        "head",
+        "hostname",
+        "id",
+        "ls",
+        "ps",
+        "pwd",
+        "tail",
+        "type",
+        "uname",
+        "uptime",
+        "wc",
+        "which",
+        "whoami",
+    }
+)
+_SHELL_SYNTAX = frozenset("|&;<>()$`\\\n")
+
+# Number of commands whose context-independent verdicts are kept
+_SCAN_CACHE_SIZE = 1024
+
+# Structural checks run on the command as typed
+_SYSTEM_REDIRECT_RE = re.compile(r">\s*(/etc|/usr|/var)")
+_WILDCARD_RM_RE = re.compile(r"rm\s+.*\*")
+_WILDCARD_CHMOD_RE = re.compile(r"chmod\s+.*\*")
+_PIPE_TO_SHELL_RE = re.compile(r"\|\s*(bash|sh|zsh|fish)")
+
+
+# A rule is its pattern, its reason and a word the pattern cannot match
+# without; checking for the word is far cheaper than running the pattern. The
+# word is the command a pattern starts with, so rules must keep alternatives
+# inside groups rather than at the top level
+_Rule = Tuple[Pattern[str], str, str]
+_LEADING_WORD_RE = re.compile(r"[a-z]+(?=\\[s.])")
+
+
+def _compile_rules(rules: Dict[str, str]) -> List[_Rule]:
+    """Compile a pattern-to-reason table, keeping its order."""
+    compiled = []
+    for pattern, reason in rules.items():
+        # Rules not starting with a plain word get "", which is always present
+        leading_word = _LEADING_WORD_RE.match(pattern)
+        compiled.append(
+            (re.compile(pattern), reason, leading_word[0] if leading_word else "")
+        )
+    return compiled
+
 
+def _combine_rules(rules: List[_Rule]) -> Pattern[str]:
+    """Compile one pattern matching wherever any of the rules matches."""
+    return re.compile("|".join(f"(?:{pattern.pattern})" for pattern, _, _ in rules))
 
-class DangerLevel(Enum):
-    """Danger levels for commands."""
+
+def _matching_reasons(
+    rule_filter: Pattern[str], rules: List[_Rule], text: str
+) -> List[str]:
+    """Return the reasons of every rule matching text, in rule order."""
+    if not rule_filter.search(text):
+        return []
+    return [
+        reason
+        for pattern, reason, word in rules
+        if word in text and pattern.search(text)
+    ]
+
+
+class DangerLevel(IntEnum):
+    """Danger levels for commands, ordered from least to most dangerous."""
 
     SAFE = 0
     LOW = 1
@@ -17,9 +99,19 @@ class DangerLevel(Enum):
     CRITICAL = 4
 
 
+# Suggestion added once for each danger level with at least one matching rule
+_LEVEL_SUGGESTIONS = (
+    (DangerLevel.HIGH, "Double-check the target path and consider backing up first"),
+    (DangerLevel.MEDIUM, "Verify the operation is intended and paths are correct"),
+    (DangerLevel.LOW, "Review the operation carefully"),
+)
+
+
 class CommandRisk:
     """Represents the risk assessment of a command."""
 
+    __slots__ = ("level", "reasons", "suggestions")
+
     def __init__(
         self,
         level: DangerLevel,
@@ -33,12 +125,12 @@ class CommandRisk:
     @property
     def is_dangerous(self) -> bool:
         """Check if command is considered dangerous."""
-        return self.level.value >= DangerLevel.MEDIUM.value
+        return self.level >= DangerLevel.MEDIUM
 
     @property
     def requires_confirmation(self) -> bool:
         """Check if command requires confirmation."""
-        return self.level.value >= DangerLevel.LOW.value
+        return self.level >= DangerLevel.LOW
 
 
 class SafetyAnalyzer:
@@ -51,49 +143,72 @@ class SafetyAnalyzer:
         """Setup dangerous command patterns and rules."""
 
         # Critical danger patterns - immediate system destruction
-        self.critical_patterns = {
-            r"rm\s+-rf\s+/": "Attempting to delete root filesystem",
-            r":\(\)\{\s*:\|\:&\s*\};:": "Fork bomb attempt",
-            r"dd\s+if=/dev/(zero|random)\s+of=/dev/[sh]d[a-z]": "Attempting to overwrite disk",
-            r"mkfs\.\w+\s+/dev/[sh]d[a-z]": "Attempting to format disk",
-            r"rm\s+-rf\s+\*": "Attempting to delete all files recursively",
-            r"echo\s+.*>\s*/etc/(passwd|shadow|sudoers)": "Attempting to modify critical system files",
-        }
+        self.critical_patterns = _compile_rules(
+            {
+                r"rm\s+-rf\s+/": "Attempting to delete root filesystem",
+                r":\(\)\{\s*:\|\:&\s*\};:": "Fork bomb attempt",
+                r"dd\s+if=/dev/(zero|random)\s+of=/dev/[sh]d[a-z]": "Attempting to overwrite disk",
+                r"mkfs\.\w+\s+/dev/[sh]d[a-z]": "Attempting to format disk",
+                r"rm\s+-rf\s+\*": "Attempting to delete all files recursively",
+                r"echo\s+.*>\s*/etc/(passwd|shadow|sudoers)": "Attempting to modify critical system files",
+            }
+        )
 
         # High danger patterns - significant system impact
-        self.high_patterns = {
-            r"sudo\s+rm\s+-rf": "Recursive deletion with sudo privileges",
-            r"chmod\s+-R\s+777\s+/": "Setting dangerous permissions on root",
-            r"chown\s+-R\s+.*:/": "Changing ownership of system directories",
-            r"killall\s+-9\s+(init|systemd|kernel)": "Attempting to kill critical system processes",
-            r"(reboot|shutdown|halt)\s+(-f|--force)": "Forced system shutdown/reboot",
-            r"iptables\s+-F": "Flushing firewall rules",
-            r"history\s+-c": "Clearing command history",
-            r"shred\s+.*": "Securely deleting files",
-        }
+        self.high_patterns = _compile_rules(
+            {
+                r"sudo\s+rm\s+-rf": "Recursive deletion with sudo privileges",
+                r"chmod\s+-R\s+777\s+/": "Setting dangerous permissions on root",
+                r"chown\s+-R\s+.*:/": "Changing ownership of system directories",
+                r"killall\s+-9\s+(init|systemd|kernel)": "Attempting to kill critical system processes",
+                r"(reboot|shutdown|halt)\s+(-f|--force)": "Forced system shutdown/reboot",
+                r"iptables\s+-F": "Flushing firewall rules",
+                r"history\s+-c": "Clearing command history",
+                r"shred\s+.*": "Securely deleting files",
+            }
+        )
 
         # Medium danger patterns - potential data loss or security issues
-        self.medium_patterns = {
-            r"rm\s+-rf\s+[^/\s]": "Recursive deletion",
-            r"mv\s+.*\s+/dev/null": "Moving files to null device",
-            r">\s*/etc/": "Redirecting output to system config files",
-            r"chmod\s+[0-7]{3}\s+.*\.(sh|py|pl|rb)": "Changing executable permissions",
-            r"find\s+.*-exec\s+rm": "Finding and deleting files",
-            r"tar\s+.*--overwrite": "Overwriting files during extraction",
-            r"wget\s+.*\|\s*(bash|sh)": "Downloading and executing remote scripts",
-            r"curl\s+.*\|\s*(bash|sh)": "Downloading and executing remote scripts",
-        }
+        self.medium_patterns = _compile_rules(
+            {
+                r"rm\s+-rf\s+[^/\s]": "Recursive deletion",
+                r"mv\s+.*\s+/dev/null": "Moving files to null device",
+                r">\s*/etc/": "Redirecting output to system config files",
+                r"chmod\s+[0-7]{3}\s+.*\.(sh|py|pl|rb)": "Changing executable permissions",
+                r"find\s+.*-exec\s+rm": "Finding and deleting files",
+                r"tar\s+.*--overwrite": "Overwriting files during extraction",
+                r"wget\s+.*\|\s*(bash|sh)": "Downloading and executing remote scripts",
+                r"curl\s+.*\|\s*(bash|sh)": "Downloading and executing remote scripts",
+            }
+        )
 
         # Low danger patterns - potentially risky operations
-        self.low_patterns = {
-            r"rm\s+[^-]": "Deleting files",
-            r"cp\s+.*\s+.*\.(conf|cfg|ini)": "Copying configuration files",
-            r"mv\s+.*\.(conf|cfg|ini)": "Moving configuration files",
-            r"nano\s+/etc/": "Editing system configuration",
-            r"vi\s+/etc/": "Editing system configuration",
-            r"chmod\s+\+x": "Making files executable",
-            r"sudo\s+[^rm]": "Running command with sudo privileges",
-        }
+        self.low_patterns = _compile_rules(
+            {
+                r"rm\s+[^-]": "Deleting files",
+                r"cp\s+.*\s+.*\.(conf|cfg|ini)": "Copying configuration files",
+                r"mv\s+.*\.(conf|cfg|ini)": "Moving configuration files",
+                r"nano\s+/etc/": "Editing system configuration",
+                r"vi\s+/etc/": "Editing system configuration",
+                r"chmod\s+\+x": "Making files executable",
+                r"sudo\s+[^rm]": "Running command with sudo privileges",
+            }
+        )
+
+        self._rule_levels = (
+            self.critical_patterns,
+            self.high_patterns,
+            self.medium_patterns,
+            self.low_patterns,
+        )
+        # A single scan per level rejects commands matching none of its rules;
+        # only a hit needs the individual patterns to tell which reasons apply
+        self._rule_filters = tuple(_combine_rules(rules) for rules in self._rule_levels)
+        self._rule_database = self._compile_rule_database()
+
+        # Verdicts on the command text are reused whatever the directory; only
+        # the cheap context check is repeated. Rebuilt with the rules
+        self._cached_scan = lru_cache(maxsize=_SCAN_CACHE_SIZE)(self._scan_command)
 
         # Safe command prefixes - these are generally safe
         self.safe_prefixes = {
@@ -163,6 +278,10 @@ class SafetyAnalyzer:
             "/dev/nvme",
             "/dev/hd",
         }
+        # Every directory is under "/", so it does not count as protected here
+        self._protected_prefixes = tuple(
+            path for path in self.protected_paths if path != "/"
+        )
 
     def analyze_command(
         self, command: str, context: Optional[Dict[str, Any]] = None
@@ -171,78 +290,142 @@ class SafetyAnalyzer:
         if not command.strip():
             return CommandRisk(DangerLevel.SAFE, [])
 
-        # Normalize command
-        command_lower = command.lower().strip()
-
-        # Check for critical patterns
-        for pattern, reason in self.critical_patterns.items():
-            if re.search(pattern, command_lower):
-                return CommandRisk(
-                    DangerLevel.CRITICAL,
-                    [reason],
-                    [
-                        "This command can cause irreversible system damage",
-                        "Consider alternatives or seek expert help",
-                    ],
-                )
-
-        # Check for high danger patterns
-        reasons = []
-        suggestions = []
-        max_level = DangerLevel.SAFE
+        if command.split(None, 1)[0] in _SAFE_COMMANDS and _SHELL_SYNTAX.isdisjoint(
+            command
+        ):
+            # Only the working directory can still make these risky
+            if context:
+                context_risk = self._analyze_context(command, context)
+                if context_risk.level != DangerLevel.SAFE:
+                    return context_risk
+            return CommandRisk(DangerLevel.SAFE, ["Safe read-only operation"])
 
-        for pattern, reason in self.high_patterns.items():
-            if re.search(pattern, command_lower):
-                reasons.append(reason)
-                if DangerLevel.HIGH.value > max_level.value:
-                    max_level = DangerLevel.HIGH
-                suggestions.append(
-                    "Double-check the target path and consider backing up first"
-                )
-
-        # Check for medium danger patterns
-        for pattern, reason in self.medium_patterns.items():
-            if re.search(pattern, command_lower):
-                reasons.append(reason)
-                if DangerLevel.MEDIUM.value > max_level.value:
-                    max_level = DangerLevel.MEDIUM
-                suggestions.append(
-                    "Verify the operation is intended and paths are correct"
-                )
+        pattern_risk, structure_risk, safe_prefix = self._cached_scan(command)
+        if pattern_risk.level == DangerLevel.CRITICAL:
+            return pattern_risk
 
-        # Check for low danger patterns
-        for pattern, reason in self.low_patterns.items():
-            if re.search(pattern, command_lower):
-                reasons.append(reason)
-                if DangerLevel.LOW.value > max_level.value:
-                    max_level = DangerLevel.LOW
-                suggestions.append("Review the operation carefully")
+        reasons = list(pattern_risk.reasons)
+        suggestions = list(pattern_risk.suggestions)
+        max_level = pattern_risk.level
 
         # Context-aware analysis
         if context:
             context_risks = self._analyze_context(command, context)
             reasons.extend(context_risks.reasons)
             suggestions.extend(context_risks.suggestions)
-            if context_risks.level.value > max_level.value:
-                max_level = context_risks.level
+            max_level = max(max_level, context_risks.level)
 
         # Analyze command structure
-        structure_risk = self._analyze_structure(command)
         reasons.extend(structure_risk.reasons)
         suggestions.extend(structure_risk.suggestions)
-        if structure_risk.level.value > max_level.value:
-            max_level = structure_risk.level
+        max_level = max(max_level, structure_risk.level)
 
         # Check if it's a safe command
-        if max_level == DangerLevel.SAFE:
-            try:
-                parts = shlex.split(command)
-                if parts and parts[0] in self.safe_prefixes:
-                    return CommandRisk(DangerLevel.SAFE, ["Safe read-only operation"])
-            except ValueError:
-                pass
+        if max_level == DangerLevel.SAFE and safe_prefix:
+            return CommandRisk(DangerLevel.SAFE, ["Safe read-only operation"])
+
+        # Deduplicated in the order the checks raised them
+        return CommandRisk(max_level, reasons, list(dict.fromkeys(suggestions)))
 
-        return CommandRisk(max_level, reasons, list(set(suggestions)))
+    def _scan_command(self, command: str) -> Tuple[CommandRisk, CommandRisk, bool]:
+        """Run the checks that depend on the command text alone.
+
+        Returns the pattern and structure risks and whether the command starts
+        with a safe prefix.
+        """
+        # Tokenized once for both the structure analysis and the safe check
+        try:
+            parts: Optional[List[str]] = shlex.split(command)
+        except ValueError:
+            parts = None
+
+        return (
+            self._analyze_patterns(command.lower().strip()),
+            self._analyze_structure(command, parts),
+            bool(parts) and parts[0] in self.safe_prefixes,
+        )
+
+    def _compile_rule_database(self) -> Optional[Any]:
+        """Compile all rules into one Hyperscan database, if it is available."""
+        if hyperscan is None:
+            return None
+
+        expressions = [
+            pattern.pattern.encode()
+            for rules in self._rule_levels
+            for pattern, _, _ in rules
+        ]
+        database = hyperscan.Database()
+        try:
+            database.compile(
+                expressions=expressions,
+                ids=list(range(len(expressions))),
+                elements=len(expressions),
+                flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions),
+            )
+        except hyperscan.error:
+            return None
+        return database
+
+    def _match_rules(self, command_lower: str) -> List[List[str]]:
+        """Return the reasons of the matching rules for each danger level."""
+        # Hyperscan matches bytes with ASCII classes, which agree with the re
+        # module only on printable ASCII commands
+        if self._rule_database is None or not (
+            command_lower.isascii() and command_lower.isprintable()
+        ):
+            return [
+                _matching_reasons(rule_filter, rules, command_lower)
+                for rule_filter, rules in zip(self._rule_filters, self._rule_levels)
+            ]
+
+        matched = set()
+        self._rule_database.scan(
+            command_lower.encode(),
+            match_event_handler=lambda rule_id, *_: matched.add(rule_id),
+        )
+        level_reasons = []
+        rule_id = 0
+        for rules in self._rule_levels:
+            reasons = []
+            for _, reason, _ in rules:
+                if rule_id in matched:
+                    reasons.append(reason)
+                rule_id += 1
+            level_reasons.append(reasons)
+        return level_reasons
+
+    def _analyze_patterns(self, command_lower: str) -> CommandRisk:
+        """Match the normalized command against the danger level rules."""
+        critical_reasons, high_reasons, medium_reasons, low_reasons = self._match_rules(
+            command_lower
+        )
+
+        # Check for critical patterns
+        if critical_reasons:
+            return CommandRisk(
+                DangerLevel.CRITICAL,
+                [critical_reasons[0]],
+                [
+                    "This command can cause irreversible system damage",
+                    "Consider alternatives or seek expert help",
+                ],
+            )
+
+        # Check for high, medium and low danger patterns
+        reasons = []
+        suggestions = []
+        max_level = DangerLevel.SAFE
+
+        for (level, suggestion), level_reasons in zip(
+            _LEVEL_SUGGESTIONS, (high_reasons, medium_reasons, low_reasons)
+        ):
+            if level_reasons:
+                reasons.extend(level_reasons)
+                max_level = max(max_level, level)
+                suggestions.append(suggestion)
+
+        return CommandRisk(max_level, reasons, suggestions)
 
     def _analyze_context(self, command: str, context: Dict[str, Any]) -> CommandRisk:
         """Analyze command in context of current directory and files."""
@@ -254,88 +437,80 @@ class SafetyAnalyzer:
         files = context.get("files", [])
 
         # Check if operating in system directories
-        if cwd:
-            cwd_path = Path(cwd)
-            for protected in self.protected_paths:
-                if str(cwd_path).startswith(protected) and protected != "/":
+        if cwd and cwd.startswith(self._protected_prefixes):
+            for protected in self._protected_prefixes:
+                if cwd.startswith(protected):
                     reasons.append(f"Operating in protected directory: {protected}")
-                    if DangerLevel.MEDIUM.value > level.value:
-                        level = DangerLevel.MEDIUM
+                    level = max(level, DangerLevel.MEDIUM)
                     suggestions.append(
                         "Be extra careful when modifying system directories"
                     )
 
         # Check for operations on important files
-        if "rm" in command.lower() or "mv" in command.lower():
-            important_files = [
-                f
-                for f in files
-                if f.startswith(".")
-                or f.endswith((".conf", ".cfg", ".ini", ".yaml", ".json"))
-            ]
-            if important_files:
-                reasons.append("Command may affect configuration files")
-                if DangerLevel.LOW.value > level.value:
-                    level = DangerLevel.LOW
-                suggestions.append("Backup important files before modification")
+        command_lower = command.lower()
+        if ("rm" in command_lower or "mv" in command_lower) and any(
+            f.startswith(".") or f.endswith((".conf", ".cfg", ".ini", ".yaml", ".json"))
+            for f in files
+        ):
+            reasons.append("Command may affect configuration files")
+            level = max(level, DangerLevel.LOW)
+            suggestions.append("Backup important files before modification")
 
         return CommandRisk(level, reasons, suggestions)
 
-    def _analyze_structure(self, command: str) -> CommandRisk:
-        """Analyze command structure for risky patterns."""
+    def _analyze_structure(
+        self, command: str, parts: Optional[List[str]]
+    ) -> CommandRisk:
+        """Analyze command structure for risky patterns.
+
+        parts is the shlex tokenization of command, or None if it is malformed.
+        """
         reasons = []
         suggestions = []
         level = DangerLevel.SAFE
 
         # Check for command chaining
-        if any(op in command for op in ["&&", "||", ";"]):
+        if "&&" in command or "||" in command or ";" in command:
             reasons.append("Command contains multiple operations")
-            if DangerLevel.LOW.value > level.value:
-                level = DangerLevel.LOW
+            level = max(level, DangerLevel.LOW)
             suggestions.append("Review each operation in the chain")
 
-        # Check for redirection to important locations
-        if re.search(r">\s*(/etc|/usr|/var)", command):
+        # Check for redirection to important locations. Each pattern below needs
+        # a character most commands lack, so a substring test runs first
+        if ">" in command and _SYSTEM_REDIRECT_RE.search(command):
             reasons.append("Output redirection to system directories")
-            if DangerLevel.MEDIUM.value > level.value:
-                level = DangerLevel.MEDIUM
+            level = max(level, DangerLevel.MEDIUM)
             suggestions.append("Ensure you have proper permissions and backup files")
 
         # Check for wildcards in dangerous contexts
-        if re.search(r"rm\s+.*\*", command) or re.search(r"chmod\s+.*\*", command):
+        if "*" in command and (
+            _WILDCARD_RM_RE.search(command) or _WILDCARD_CHMOD_RE.search(command)
+        ):
             reasons.append("Wildcard usage in potentially destructive command")
-            if DangerLevel.MEDIUM.value > level.value:
-                level = DangerLevel.MEDIUM
+            level = max(level, DangerLevel.MEDIUM)
             suggestions.append(
                 "Be specific about target files instead of using wildcards"
             )
 
         # Check for pipe to shell execution
-        if re.search(r"\|\s*(bash|sh|zsh|fish)", command):
+        if "|" in command and _PIPE_TO_SHELL_RE.search(command):
             reasons.append("Piping output to shell execution")
-            if DangerLevel.HIGH.value > level.value:
-                level = DangerLevel.HIGH
+            level = max(level, DangerLevel.HIGH)
             suggestions.append("Verify the source and content before execution")
 
         # Check for dangerous executables
-        try:
-            parts = shlex.split(command)
-            if parts:
-                executable = parts[0].split("/")[-1]  # Get basename
-                if executable in self.dangerous_executables:
-                    reasons.append(
-                        f"Using potentially dangerous executable: {executable}"
-                    )
-                    if DangerLevel.MEDIUM.value > level.value:
-                        level = DangerLevel.MEDIUM
-                    suggestions.append(
-                        "Ensure you understand the implications of this command"
-                    )
-        except ValueError:
+        if parts:
+            executable = parts[0].split("/")[-1]  # Get basename
+            if executable in self.dangerous_executables:
+                reasons.append(f"Using potentially dangerous executable: {executable}")
+                level = max(level, DangerLevel.MEDIUM)
+                suggestions.append(
+                    "Ensure you understand the implications of this command"
+                )
+        elif parts is None:
             # Malformed command
             reasons.append("Command has malformed syntax")
-            if DangerLevel.LOW.value > level.value:
-                level = DangerLevel.LOW
+            level = max(level, DangerLevel.LOW)
             suggestions.append("Check command syntax before execution")
 
         return CommandRisk(level, reasons, suggestions)
@@ -343,8 +518,9 @@ class SafetyAnalyzer:
     def get_safety_tips(self, command: str) -> List[str]:
         """Get general safety tips for command execution."""
         tips = []
+        command_lower = command.lower()
 
-        if "rm" in command.lower():
+        if "rm" in command_lower:
             tips.extend(
                 [
                     "Use 'ls' first to see what files will be affected",
@@ -353,7 +529,7 @@ class SafetyAnalyzer:
                 ]
             )
 
-        if "sudo" in command.lower():
+        if "sudo" in command_lower:
             tips.extend(
                 [
                     "Understand why sudo privileges are needed",
@@ -362,7 +538,7 @@ class SafetyAnalyzer:
                 ]
             )
 
-        if any(op in command for op in [">", ">>"]):
+        if ">" in command:  # Also covers ">>"
             tips.extend(
                 [
                     "Backup the target file before overwriting",
@@ -0,0 +1,159 @@
+"""Persistent bash process for running shell commands."""
+
+import atexit
+import os
+import selectors
+import shlex
+import signal
+import subprocess
+import time
+import uuid
+from pathlib import Path
+from typing import Optional, Tuple
+
+_READ_SIZE = 65536
+
+
+class PersistentShell:
+    """Run commands in one long-lived bash process instead of forking per command.
+
+    Each command is followed by a random marker on stdout and stderr so its
+    output can be framed; the stdout marker also carries the exit status and
+    the shell's working directory.
+    """
+
+    def __init__(self, executable: str = "bash"):
+        self.executable = executable
+        self.cwd: Optional[Path] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._marker = uuid.uuid4().hex
+
+    def _start(self, cwd: Path) -> subprocess.Popen:
+        """Start a fresh bash process in the given directory."""
+        self._process = subprocess.Popen(
+            [self.executable, "--noprofile", "--norc", "-s"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+            cwd=cwd,
+            start_new_session=True,
+        )
+        self.cwd = cwd
+        # Only a running shell needs cleaning up at exit; close() drops the
+        # hook again so closed shells are not kept alive until then
+        atexit.unregister(self.close)
+        atexit.register(self.close)
+        return self._process
+
+    def _kill(self):
+        """Kill the bash process together with anything it started."""
+        process, self._process = self._process, None
+        if process is None or process.poll() is not None:
+            return
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (AttributeError, ProcessLookupError):
+            process.kill()
+        process.wait()
+
+    def run(
+        self, command: str, cwd: Path, timeout: float
+    ) -> Tuple[subprocess.CompletedProcess, Path]:
+        """Run a command and return its result along with the shell's new cwd."""
+        process = self._process
+        if process is None or process.poll() is not None:
+            process = self._start(cwd)
+
+        lines = []
+        if cwd != self.cwd:
+            lines.append(f"cd -- {shlex.quote(str(cwd))}")
+        # eval keeps syntax errors from swallowing the marker lines
+        lines.append(f"eval {shlex.quote(command)} </dev/null")
+        lines.append(f'printf "%s:%s:%s\\n" {self._marker} "$?" "$PWD"')
+        lines.append(f'printf "%s\\n" {self._marker} >&2')
+        process.stdin.write(("\n".join(lines) + "\n").encode())
+
+        try:
+            stdout, stderr, trailer = self._read_until_marker(process, timeout)
+        except subprocess.TimeoutExpired:
+            self._kill()
+            raise subprocess.TimeoutExpired(command, timeout)
+        except BaseException:
+            # Leftover output would be mistaken for the next command's
+            self._kill()
+            raise
+
+        if trailer is None:  # the command exited the shell
+            returncode = process.wait()
+            self._process = None
+        else:
+            status, _, pwd = trailer.partition(":")
+            returncode = int(status)
+            self.cwd = Path(pwd)
+
+        result = subprocess.CompletedProcess(command, returncode, stdout, stderr)
+        return result, self.cwd
+
+    def _read_until_marker(
+        self, process: subprocess.Popen, timeout: float
+    ) -> Tuple[str, str, Optional[str]]:
+        """Read stdout and stderr up to the markers, returning the stdout trailer."""
+        marker = self._marker.encode()
+        buffers = {process.stdout: bytearray(), process.stderr: bytearray()}
+        framed = {}
+        deadline = time.monotonic() + timeout
+
+        with selectors.DefaultSelector() as selector:
+            for stream in buffers:
+                selector.register(stream, selectors.EVENT_READ)
+
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(self.executable, timeout)
+
+                for key, _ in selector.select(remaining):
+                    stream = key.fileobj
+                    chunk = os.read(key.fd, _READ_SIZE)
+                    if not chunk:
+                        selector.unregister(stream)
+                        continue
+
+                    buffer = buffers[stream]
+                    buffer += chunk
+                    start = buffer.find(marker)
+                    end = buffer.find(b"\n", start) if start != -1 else -1
+                    if end != -1:
+                        framed[stream] = (start, end)
+                        selector.unregister(stream)
+
+        def _decode(data: bytes) -> str:
+            return data.decode("utf-8", errors="replace")
+
+        stdout, stderr = buffers[process.stdout], buffers[process.stderr]
+        if process.stdout not in framed or process.stderr not in framed:
+            return _decode(stdout), _decode(stderr), None
+
+        out_start, out_end = framed[process.stdout]
+        err_start, _ = framed[process.stderr]
+        trailer = stdout[out_start + len(marker) + 1 : out_end]
+        return (
+            _decode(stdout[:out_start]),
+            _decode(stderr[:err_start]),
+            _decode(trailer),
+        )
+
+    def close(self):
+        """Shut the bash process down."""
+        atexit.unregister(self.close)
+        process = self._process
+        if process is None:
+            return
+        if process.poll() is None:
+            try:
+                process.stdin.close()
+                process.wait(timeout=1)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        self._kill()
@@ -0,0 +1,43 @@
+"""Shared setup for the demo and model test scripts."""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Tuple
+
+from llmshell.cli import run_async
+from llmshell.config import LLMShellConfig
+from llmshell.core import ShellSession
+from llmshell.llm import (
+    LLMProvider,
+    close_shared_http_clients,
+    create_llm_provider,
+    get_shared_http_client,
+)
+
+
+@asynccontextmanager
+async def demo_provider() -> (
+    AsyncIterator[Tuple[LLMShellConfig, LLMProvider, ShellSession]]
+):
+    """Yield (config, provider, session) and release them all afterwards.
+
+    The provider uses the event loop's shared HTTP client, so every request a
+    script makes reuses the same pooled connections.
+    """
+    config = LLMShellConfig()
+    provider = create_llm_provider(
+        config.llm, http_client=get_shared_http_client(config.llm.timeout)
+    )
+    session = ShellSession(config, provider)
+    try:
+        yield config, provider, session
+    finally:
+        session.history_manager.close()
+        if session.persistent_shell:
+            session.persistent_shell.close()
+        await provider.close()
+        await close_shared_http_clients()
+
+
+def run_demo(coro):
+    """Run a script's entry coroutine, on uvloop when it is installed."""
+    return run_async(coro)
@@ -4,7 +4,6 @@ Demo script to test LLMShell interactive functionality.
 This demonstrates the core features without entering full interactive mode.
 """
 
-import asyncio
 import sys
 from pathlib import Path
 
@@ -15,6 +14,8 @@ from llmshell.config import load_config
 from llmshell.core import ShellSession
 from llmshell.llm import create_llm_provider, test_llm_connection
 
+from _demo_common import run_demo
+
 
 async def demo_shell_session():
     """Demonstrate the shell session functionality."""
@@ -42,7 +43,7 @@ async def demo_shell_session():
     print("🔌 Testing LLM connection...")
     if not await test_llm_connection(provider):
         print("❌ LLM connection failed.")
-        provider.close()
+        await provider.close()
         return
 
     print("✅ LLM connection successful!")
@@ -63,39 +64,50 @@ async def demo_shell_session():
     print("🎯 Running Demo Commands:")
     print("-" * 30)
 
+    # The natural language demos come before anything that changes the
+    # directory, so all of them are translated concurrently up front
+    natural_commands = [c for c in demo_commands if session.is_natural_input(c)]
+    try:
+        translations = dict(
+            zip(natural_commands, await session.translate_commands(natural_commands))
+        )
+    except Exception as e:
+        print(f"❌ Error translating demo commands: {e}")
+        translations = {}
+
     for i, command in enumerate(demo_commands, 1):
         print(f"\n[{i}/{len(demo_commands)}] Demo: '{command}'")
         print("-" * 40)
 
-        # Simulate user input processing
+        # For this demo, we'll bypass the confirmation prompts
+        original_confirm = config.execution.always_confirm
+        config.execution.always_confirm = False
         try:
-            # For this demo, we'll bypass the confirmation prompts
-            original_confirm = config.execution.always_confirm
-            config.execution.always_confirm = False
-
-            # Process the command
-            continue_session = await session.process_user_input(command)
-
-            # Restore original setting
-            config.execution.always_confirm = original_confirm
+            # Process the command, reusing its translation when there is one
+            continue_session = await session.process_user_input(
+                command, translations.get(command)
+            )
 
             if not continue_session:
                 break
 
         except Exception as e:
             print(f"❌ Error processing '{command}': {e}")
+        finally:
+            # Restore original setting
+            config.execution.always_confirm = original_confirm
 
     print("\n" + "=" * 50)
     print("✅ Demo completed!")
     print("\nTo start the full interactive shell, run: llmshell shell")
 
-    provider.close()
+    await provider.close()
 
 
 def main():
     """Main demo function."""
     try:
-        asyncio.run(demo_shell_session())
+        run_demo(demo_shell_session())
     except KeyboardInterrupt:
         print("\n👋 Demo cancelled!")
     except Exception as e:
@@ -10,21 +10,61 @@ This script helps prepare the project for release by:
 5. Generating release notes
 """
 
+import asyncio
+import hashlib
 import json
+import os
+import shutil
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import click
 from rich.console import Console
 from rich.panel import Panel
-from rich.progress import track
+from rich.progress import (
+    BarColumn,
+    Progress,
+    SpinnerColumn,
+    TaskProgressColumn,
+    TextColumn,
+)
 from rich.table import Table
 
 console = Console()
 
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def _sha256_line(file_path: Path) -> str:
+    """Return a sha256sum-style line for file_path."""
+    with open(file_path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            digest = hashlib.file_digest(f, "sha256")
+        else:
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    return f"{digest.hexdigest()}  {file_path}"
+
+
+def _stream_command(cmd: List[str], cwd: Path) -> int:
+    """Run cmd, echoing its combined output line by line as it arrives."""
+    with subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+    ) as process:
+        for line in process.stdout:
+            console.print(line.rstrip(), markup=False, highlight=False)
+    return process.returncode
+
 
 class ReleaseManager:
     """Manages the release preparation process."""
@@ -37,13 +77,15 @@ class ReleaseManager:
 
     def _get_version(self) -> str:
         """Extract version from pyproject.toml."""
-        pyproject_path = self.project_root / "pyproject.toml"
-        with open(pyproject_path) as f:
-            content = f.read()
-            for line in content.split("\\n"):
-                if line.strip().startswith("version"):
-                    return line.split("=")[1].strip().strip('"')
-        return "unknown"
+        try:
+            import tomllib
+        except ImportError:  # Python 3.10
+            import tomli as tomllib
+
+        with open(self.project_root / "pyproject.toml", "rb") as f:
+            pyproject = tomllib.load(f)
+
+        return pyproject.get("project", {}).get("version", "unknown")
 
     def run_tests(self) -> bool:
         """Run comprehensive test suite."""
@@ -54,29 +96,23 @@ class ReleaseManager:
             console.print("❌ Test runner not found", style="bold red")
             return False
 
-        result = subprocess.run(
-            [sys.executable, str(test_script)], 
-            cwd=self.project_root,
-            capture_output=True,
-            text=True
+        returncode = _stream_command(
+            [sys.executable, str(test_script)], cwd=self.project_root
         )
 
-        if result.returncode == 0:
+        if returncode == 0:
             console.print("✅ All tests passed!", style="bold green")
             return True
         else:
             console.print("❌ Tests failed", style="bold red")
-            console.print(result.stdout)
-            console.print(result.stderr)
             return False
 
-    def build_packages(self) -> bool:
-        """Build distribution packages."""
+    async def build_packages(self) -> bool:
+        """Build the wheel and sdist concurrently."""
         console.print("📦 Building distribution packages...", style="bold blue")
 
         # Clean previous builds
-        if self.build_dir.exists():
-            subprocess.run(["rm", "-rf", str(self.build_dir)])
+        shutil.rmtree(self.build_dir, ignore_errors=True)
         self.build_dir.mkdir(exist_ok=True)
 
         # Build with standard Python build tools
@@ -85,17 +121,39 @@ class ReleaseManager:
             [sys.executable, "-m", "build", "--sdist"],
         ]
 
-        for cmd in track(build_commands, description="Building packages..."):
-            result = subprocess.run(
-                cmd, cwd=self.project_root, capture_output=True, text=True
-            )
-            if result.returncode != 0:
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            console=console,
+        ) as progress:
+            task = progress.add_task("Building packages...", total=len(build_commands))
+
+            async def build(cmd: List[str]) -> Tuple[int, bytes]:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    cwd=self.project_root,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                _, stderr = await process.communicate()
+                progress.advance(task)
+                return process.returncode, stderr
+
+            results = await asyncio.gather(*(build(cmd) for cmd in build_commands))
+
+        # Report every failed build, not just the first one
+        success = True
+        for cmd, (returncode, stderr) in zip(build_commands, results):
+            if returncode != 0:
                 console.print(f"❌ Build failed: {' '.join(cmd)}", style="bold red")
-                console.print(result.stderr)
-                return False
+                console.print(stderr.decode(errors="replace"))
+                success = False
 
-        console.print("✅ Packages built successfully!", style="bold green")
-        return True
+        if success:
+            console.print("✅ Packages built successfully!", style="bold green")
+        return success
 
     def validate_packages(self) -> bool:
         """Validate built packages."""
@@ -107,19 +165,15 @@ class ReleaseManager:
             return False
 
         # Check with twine
-        result = subprocess.run(
-            ["twine", "check"] + [str(f) for f in dist_files],
-            cwd=self.project_root,
-            capture_output=True,
-            text=True
+        returncode = _stream_command(
+            ["twine", "check"] + [str(f) for f in dist_files], cwd=self.project_root
         )
 
-        if result.returncode == 0:
+        if returncode == 0:
             console.print("✅ Package validation passed!", style="bold green")
             return True
         else:
             console.print("❌ Package validation failed", style="bold red")
-            console.print(result.stderr)
             return False
 
     def create_release_artifacts(self) -> bool:
@@ -129,10 +183,11 @@ class ReleaseManager:
         self.release_dir.mkdir(exist_ok=True)
 
         # Copy distribution files
-        if self.build_dir.exists():
-            subprocess.run(
-                ["cp", "-r"] + [str(f) for f in self.build_dir.glob("*")] + [str(self.release_dir)]
-            )
+        for path in self.build_dir.glob("*"):
+            if path.is_dir():
+                shutil.copytree(path, self.release_dir / path.name, dirs_exist_ok=True)
+            else:
+                shutil.copy2(path, self.release_dir / path.name)
 
         # Generate release notes
         release_notes = self._generate_release_notes()
@@ -148,15 +203,15 @@ class ReleaseManager:
         """Generate release notes from CHANGELOG."""
         changelog_path = self.project_root / "CHANGELOG.md"
         if not changelog_path.exists():
-            return f"# Release Notes v{self.version}\\n\\nNo changelog available."
+            return f"# Release Notes v{self.version}\n\nNo changelog available."
 
         with open(changelog_path) as f:
             content = f.read()
 
         # Extract current version section
-        lines = content.split("\\n")
+        lines = content.split("\n")
         in_current_version = False
-        release_notes = [f"# LLMShell v{self.version} Release Notes\\n"]
+        release_notes = [f"# LLMShell v{self.version} Release Notes\n"]
 
         for line in lines:
             if line.startswith(f"## [{self.version}]") or line.startswith(f"## {self.version}"):
@@ -167,23 +222,20 @@ class ReleaseManager:
             elif in_current_version:
                 release_notes.append(line)
 
-        return "\\n".join(release_notes)
+        return "\n".join(release_notes)
 
     def _create_checksums(self) -> None:
         """Create checksums for release files."""
-        checksums = []
-        for file_path in self.release_dir.glob("*"):
-            if file_path.is_file() and not file_path.name.endswith(".md"):
-                result = subprocess.run(
-                    ["sha256sum", str(file_path)], 
-                    capture_output=True, 
-                    text=True
-                )
-                if result.returncode == 0:
-                    checksums.append(result.stdout.strip())
+        files = [
+            file_path
+            for file_path in self.release_dir.glob("*")
+            if file_path.is_file() and not file_path.name.endswith(".md")
+        ]
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            checksums = list(executor.map(_sha256_line, files))
 
         if checksums:
-            (self.release_dir / "SHA256SUMS").write_text("\\n".join(checksums))
+            (self.release_dir / "SHA256SUMS").write_text("\n".join(checksums))
 
     def print_release_summary(self) -> None:
         """Print release summary."""
@@ -236,7 +288,8 @@ def main(skip_tests: bool, clean: bool):
 
     if clean:
         console.print("🧹 Cleaning previous builds...")
-        subprocess.run(["rm", "-rf", "dist", "build", "release"], cwd=project_root)
+        for name in ("dist", "build", "release"):
+            shutil.rmtree(project_root / name, ignore_errors=True)
 
     success = True
 
@@ -248,7 +301,7 @@ def main(skip_tests: bool, clean: bool):
 
     # Build packages
     if success:
-        success &= release_manager.build_packages()
+        success &= asyncio.run(release_manager.build_packages())
 
     # Validate packages
     if success:
@@ -3,16 +3,19 @@
 Development script to verify installation and basic functionality.
 """
 
+import shutil
 import subprocess
 import sys
 from pathlib import Path
 
+OLLAMA_TAGS_URL = "http://localhost:11434/api/tags"
 
-def run_command(cmd: str, description: str):
+
+def run_command(cmd: list[str], description: str):
     """Run a command and report results."""
     print(f"🔧 {description}...")
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
         if result.returncode == 0:
             print(f"   ✅ Success")
             if result.stdout.strip():
@@ -45,19 +48,29 @@ def check_ollama():
     print("🔍 Checking Ollama...")
 
     # Check if ollama command exists
-    if not run_command("which ollama", "Checking Ollama installation"):
+    print("🔧 Checking Ollama installation...")
+    ollama_path = shutil.which("ollama")
+    if ollama_path is None:
+        print("   ❌ ollama not found on PATH")
         print("   💡 Install Ollama from: https://ollama.ai/")
         return False
+    print(f"   ✅ Found {ollama_path}")
 
     # Check if Ollama is running
-    if not run_command(
-        "curl -s http://localhost:11434/api/tags", "Checking Ollama service"
-    ):
+    print("🔧 Checking Ollama service...")
+    try:
+        import httpx
+
+        response = httpx.get(OLLAMA_TAGS_URL, timeout=1.0)
+        response.raise_for_status()
+    except Exception as e:
+        print(f"   ❌ Not reachable: {e}")
         print("   💡 Start Ollama with: ollama serve")
         return False
+    print("   ✅ Success")
 
     # List available models
-    run_command("ollama list", "Listing available models")
+    run_command([ollama_path, "list"], "Listing available models")
     return True
 
 
@@ -105,7 +118,7 @@ def main():
     print()
 
     # Test CLI
-    if run_command("python -m llmshell.cli --help", "Testing CLI"):
+    if run_command([sys.executable, "-m", "llmshell.cli", "--help"], "Testing CLI"):
         print("✅ CLI is working")
     else:
         print("❌ CLI test failed")
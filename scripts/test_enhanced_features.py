@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """Test script for enhanced context and history features."""
 
-import asyncio
 import sys
 import tempfile
 from pathlib import Path
@@ -14,6 +13,8 @@ from rich.console import Console
 from llmshell.context import EnhancedContextAnalyzer, ProjectType
 from llmshell.history import CommandType, HistoryEntry, HistoryManager
 
+from _demo_common import run_demo
+
 
 async def test_enhanced_features():
     """Test the enhanced context and history features."""
@@ -58,8 +59,7 @@ async def test_enhanced_features():
             ),
         ]
 
-        for entry in test_entries:
-            history_manager.add_entry(entry)
+        history_manager.add_entries_bulk(test_entries)
 
         console.print("✅ Added test history entries")
 
@@ -122,19 +122,16 @@ async def test_enhanced_features():
         ("web", ["index.html", "webpack.config.js", "style.css"]),
     ]
 
-    for project_name, files in test_projects:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            test_dir = Path(tmp_dir)
+    # One scratch directory holds every sample project
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for project_name, files in test_projects:
+            test_dir = Path(tmp_dir) / project_name
 
             # Create test files
             for file in files:
-                if "/" in file:
-                    # Create directory structure
-                    file_path = test_dir / file
-                    file_path.parent.mkdir(parents=True, exist_ok=True)
-                    file_path.touch()
-                else:
-                    (test_dir / file).touch()
+                file_path = test_dir / file
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                file_path.touch()
 
             # Analyze the test project
             test_context = analyzer.analyze_directory(test_dir)
@@ -160,4 +157,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_demo(main())
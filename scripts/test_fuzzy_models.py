@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """Test fuzzy model matching functionality."""
 
-import asyncio
 import sys
 from pathlib import Path
 
@@ -10,9 +9,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from rich.console import Console
 
-from llmshell.config import LLMShellConfig
-from llmshell.core import ShellSession
-from llmshell.llm import create_llm_provider
+from _demo_common import demo_provider, run_demo
 
 
 async def test_fuzzy_matching():
@@ -21,33 +18,27 @@ async def test_fuzzy_matching():
 
     console.print("🧪 Testing Fuzzy Model Name Matching\n", style="bold cyan")
 
-    # Load configuration and create provider
-    config = LLMShellConfig()
-    provider = create_llm_provider(config.llm)
-    session = ShellSession(config, provider)
-
-    try:
-        # Test various fuzzy matches
-        test_cases = [
-            "llama3",  # Should match "llama3:latest"
-            "deepseek",  # Should match "deepseek-r1:8b"
-            "gemma",  # Should match "gemma3:12b"
-            "nonexistent",  # Should fail gracefully
-        ]
-
-        console.print("Available models:")
-        await session.show_models()
-        console.print()
-
-        for test_name in test_cases:
-            console.print(f"🔄 Testing switch to '{test_name}':")
-            await session.switch_model(test_name)
+    async with demo_provider() as (config, provider, session):
+        try:
+            # Test various fuzzy matches
+            test_cases = [
+                "llama3",  # Should match "llama3:latest"
+                "deepseek",  # Should match "deepseek-r1:8b"
+                "gemma",  # Should match "gemma3:12b"
+                "nonexistent",  # Should fail gracefully
+            ]
+
+            console.print("Available models:")
+            await session.show_models()
             console.print()
 
-    except Exception as e:
-        console.print(f"❌ Test failed: {e}", style="red")
-    finally:
-        provider.close()
+            for test_name in test_cases:
+                console.print(f"🔄 Testing switch to '{test_name}':")
+                await session.switch_model(test_name)
+                console.print()
+
+        except Exception as e:
+            console.print(f"❌ Test failed: {e}", style="red")
 
 
 async def main():
@@ -59,4 +50,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_demo(main())
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """Interactive test of model selection in the running shell."""
 
-import asyncio
 import sys
 from pathlib import Path
 
@@ -12,6 +11,8 @@ from llmshell.config import LLMShellConfig
 from llmshell.core import start_interactive_shell
 from llmshell.llm import create_llm_provider
 
+from _demo_common import run_demo
+
 
 async def test_model_commands():
     """Test model commands interactively."""
@@ -37,4 +38,4 @@ async def test_model_commands():
 
 
 if __name__ == "__main__":
-    asyncio.run(test_model_commands())
+    run_demo(test_model_commands())
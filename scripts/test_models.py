@@ -32,7 +32,7 @@ async def test_model_functionality():
         print("✅ Connection successful\n")
     else:
         print("❌ Connection failed")
-        provider.close()
+        await provider.close()
         return
 
     # List available models
@@ -41,7 +41,7 @@ async def test_model_functionality():
 
     if not models:
         print("❌ No models found or unable to fetch models")
-        provider.close()
+        await provider.close()
         return
 
     current_model = config.llm.model
@@ -84,7 +84,7 @@ async def test_model_functionality():
                 provider.config.model = old_model
 
     print("\n🎉 Model management tests completed!")
-    provider.close()
+    await provider.close()
 
 
 async def main():
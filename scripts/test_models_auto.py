@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """Automated test of model selection features."""
 
-import asyncio
 import subprocess
 import sys
 import time
@@ -12,9 +11,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from rich.console import Console
 
-from llmshell.config import LLMShellConfig
-from llmshell.core import ShellSession
-from llmshell.llm import create_llm_provider
+from _demo_common import demo_provider, run_demo
 
 
 async def automated_model_test():
@@ -24,61 +21,55 @@ async def automated_model_test():
     console.print("🧪 Automated Model Selection Test", style="bold cyan")
     console.print("=" * 50)
 
-    # Initialize the same way the CLI does
-    config = LLMShellConfig()
-    provider = create_llm_provider(config.llm)
-    session = ShellSession(config, provider)
+    async with demo_provider() as (config, provider, session):
+        try:
+            # Test 1: Show current model
+            console.print("\n🔍 Test 1: Current Model Configuration")
+            session.show_current_model()
 
-    try:
-        # Test 1: Show current model
-        console.print("\n🔍 Test 1: Current Model Configuration")
-        session.show_current_model()
-
-        # Test 2: List available models
-        console.print("\n🔍 Test 2: Available Models")
-        await session.show_models()
+            # Test 2: List available models
+            console.print("\n🔍 Test 2: Available Models")
+            await session.show_models()
 
-        # Test 3: Test model switching
-        models = await provider.list_models()
-        if len(models) > 1:
-            # Find a different model to test
-            current_model = config.llm.model
-            test_model = None
-            for model in models:
-                if model != current_model:
-                    test_model = model
-                    break
+            # Test 3: Test model switching
+            models = await session.list_models()
+            if len(models) > 1:
+                # Find a different model to test
+                current_model = config.llm.model
+                test_model = None
+                for model in models:
+                    if model != current_model:
+                        test_model = model
+                        break
 
-            if test_model:
-                console.print(f"\n🔄 Test 3: Switching to '{test_model}'")
-                await session.switch_model(test_model)
+                if test_model:
+                    console.print(f"\n🔄 Test 3: Switching to '{test_model}'")
+                    await session.switch_model(test_model)
 
-                console.print("\n📋 Verifying switch:")
-                session.show_current_model()
+                    console.print("\n📋 Verifying switch:")
+                    session.show_current_model()
 
-                console.print(f"\n🔄 Switching back to '{current_model}'")
-                await session.switch_model(current_model)
+                    console.print(f"\n🔄 Switching back to '{current_model}'")
+                    await session.switch_model(current_model)
 
-        # Test 4: Fuzzy matching
-        console.print("\n🔍 Test 4: Fuzzy Matching")
-        console.print("Testing 'llama3' (should match 'llama3:latest')")
-        await session.switch_model("llama3")
+            # Test 4: Fuzzy matching
+            console.print("\n🔍 Test 4: Fuzzy Matching")
+            console.print("Testing 'llama3' (should match 'llama3:latest')")
+            await session.switch_model("llama3")
 
-        console.print("\nTesting 'deepseek' (should suggest 'deepseek-r1:8b')")
-        await session.switch_model("deepseek")
+            console.print("\nTesting 'deepseek' (should suggest 'deepseek-r1:8b')")
+            await session.switch_model("deepseek")
 
-        console.print("\nTesting 'nonexistent' (should show error)")
-        await session.switch_model("nonexistent")
+            console.print("\nTesting 'nonexistent' (should show error)")
+            await session.switch_model("nonexistent")
 
-        console.print("\n✅ All model tests completed!")
+            console.print("\n✅ All model tests completed!")
 
-    except Exception as e:
-        console.print(f"\n❌ Test failed: {e}", style="red")
-        import traceback
+        except Exception as e:
+            console.print(f"\n❌ Test failed: {e}", style="red")
+            import traceback
 
-        traceback.print_exc()
-    finally:
-        provider.close()
+            traceback.print_exc()
 
 
 async def main():
@@ -90,4 +81,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_demo(main())
@@ -230,7 +230,7 @@ async def run_prompt_tests():
         print(
             "❌ LLM connection failed. Make sure Ollama is running and the model is available."
         )
-        provider.close()
+        await provider.close()
         return
 
     print("✅ LLM connection successful!")
@@ -301,7 +301,7 @@ async def run_prompt_tests():
                 print(f"Expected: {', '.join(result['expected'])}")
             print()
 
-    provider.close()
+    await provider.close()
 
 
 def main():
@@ -339,7 +339,7 @@ def main():
                 except KeyboardInterrupt:
                     break
 
-            provider.close()
+            await provider.close()
 
         asyncio.run(interactive_mode())
     else:
@@ -262,3 +262,13 @@ def clean_environment(monkeypatch):
 
     for var in env_vars_to_remove:
         monkeypatch.delenv(var, raising=False)
+
+
+@pytest.fixture(autouse=True)
+def clear_config_cache():
+    """Reset cached config lookups so each test sees its own HOME/cwd."""
+    from llmshell.config import clear_config_cache
+
+    clear_config_cache()
+    yield
+    clear_config_cache()
@@ -0,0 +1,71 @@
+"""Tests for the translation cache."""
+
+from llmshell.cache import ModelListCache, TranslationCache, translation_key
+
+RESPONSE = {"command": "ls -la", "explanation": "List files", "confidence": 0.9}
+
+
+class TestTranslationCache:
+    """Test lookups, persistence and expiry of cached translations."""
+
+    def test_key_depends_on_prompt_inputs(self):
+        """Test the key changes with the input, directory and model settings only."""
+        context = {"cwd": "/tmp", "project_type": "python", "files": ["a.py"]}
+        key = translation_key("list files", context, "llama3", 0.1)
+
+        assert key == translation_key(
+            "list files", dict(context, user="x"), "llama3", 0.1
+        )
+        assert key != translation_key("list files", context, "mistral", 0.1)
+        assert key != translation_key("list files", context, "llama3", 0.7)
+        assert key != translation_key(
+            "list files", dict(context, cwd="/"), "llama3", 0.1
+        )
+        assert key != translation_key("show files", context, "llama3", 0.1)
+
+    def test_entries_persist_across_instances(self, temp_dir):
+        """Test a new cache reads entries written by an earlier one."""
+        path = temp_dir / "cache.jsonl"
+        TranslationCache(path).put("key", RESPONSE)
+
+        assert TranslationCache(path).get("key") == RESPONSE
+        assert TranslationCache(path).get("missing") is None
+
+    def test_expired_entries_are_ignored(self, temp_dir):
+        """Test entries older than the TTL are not returned."""
+        path = temp_dir / "cache.jsonl"
+        TranslationCache(path, ttl=-1).put("key", RESPONSE)
+
+        assert TranslationCache(path, ttl=-1).get("key") is None
+
+    def test_file_is_compacted(self, temp_dir):
+        """Test the file is rewritten with live entries once it grows too long."""
+        path = temp_dir / "cache.jsonl"
+        cache = TranslationCache(path, max_entries=2)
+        for i in range(20):
+            cache.put(f"key{i}", RESPONSE)
+
+        assert len(path.read_text().splitlines()) <= 8
+        reloaded = TranslationCache(path, max_entries=2)
+        assert reloaded.get("key19") == RESPONSE
+        assert reloaded.get("key0") is None
+
+
+class TestModelListCache:
+    """Test persistence and expiry of cached model lists."""
+
+    def test_lists_persist_per_url(self, temp_dir):
+        """Test a new cache reads lists written by an earlier one, by URL."""
+        path = temp_dir / "models.json"
+        ModelListCache(path).put("http://localhost:11434", ["llama3:latest"])
+
+        cache = ModelListCache(path)
+        assert cache.get("http://localhost:11434") == ["llama3:latest"]
+        assert cache.get("http://remote:11434") is None
+
+    def test_expired_lists_are_ignored(self, temp_dir):
+        """Test lists older than the TTL are not returned."""
+        path = temp_dir / "models.json"
+        ModelListCache(path, ttl=-1).put("http://localhost:11434", ["llama3:latest"])
+
+        assert ModelListCache(path, ttl=-1).get("http://localhost:11434") is None
@@ -12,6 +12,9 @@ from llmshell.config import (
     LLMShellConfig,
     LoggingConfig,
     create_default_config,
+    find_config_file,
+    get_config_paths,
+    load_config,
     load_config_file,
 )
 
@@ -105,3 +108,39 @@ def test_config_with_custom_values():
     assert config.execution.safe_mode is False
     # Other values should remain default
     assert config.llm.provider == "ollama"
+
+
+def test_load_config_returns_independent_copies():
+    """Test that changing a loaded config does not leak into later loads."""
+    first = load_config()
+    first.execution.safe_mode = False
+    first.llm.model = "changed"
+
+    second = load_config()
+    assert second is not first
+    assert second.execution.safe_mode is True
+    assert second.llm.model == LLMShellConfig().llm.model
+
+
+def test_config_paths_are_immutable():
+    """Test that the cached path list cannot be changed by callers."""
+    assert isinstance(get_config_paths(), tuple)
+
+
+def test_find_config_file(temp_dir, monkeypatch):
+    """Test that the first existing config path is returned."""
+    monkeypatch.setenv("HOME", str(temp_dir))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(temp_dir / "xdg"))
+    monkeypatch.chdir(temp_dir)
+
+    assert find_config_file() is None
+
+    home_config = temp_dir / ".llmshell.yaml"
+    home_config.write_text("llm:\n  model: home-model\n")
+    assert find_config_file() == home_config
+
+    xdg_config = temp_dir / "xdg" / "llmshell" / "config.yaml"
+    xdg_config.parent.mkdir(parents=True)
+    xdg_config.write_text("llm:\n  model: xdg-model\n")
+    assert find_config_file() == xdg_config
+    assert get_config_paths().index(xdg_config) < get_config_paths().index(home_config)
@@ -1,5 +1,6 @@
 """Unit tests for enhanced context analysis functionality."""
 
+import os
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -87,14 +88,39 @@ class TestEnhancedContextAnalyzer:
 
         # Mock git commands
         with patch("subprocess.run") as mock_run:
-            # Mock git branch command
+            # Mock git status --branch --porcelain=v2 output
             mock_run.return_value.returncode = 0
-            mock_run.return_value.stdout = "main"
+            mock_run.return_value.stdout = (
+                "# branch.oid abc123def456\n"
+                "# branch.head main\n"
+                "1 .M N... 100644 100644 100644 abc abc README.md\n"
+                "? notes.txt\n"
+            )
             mock_run.return_value.stderr = ""
 
             context = enhanced_context_analyzer.analyze_directory(git_dir)
 
             assert context.git_branch == "main"
+            assert context.git_status == "1M 1??"
+            mock_run.assert_called_once()
+
+    def test_detached_head_has_no_branch(
+        self, enhanced_context_analyzer, sample_project_dirs
+    ):
+        """Test a detached HEAD is reported as no branch, not "(detached)"."""
+        with patch("subprocess.run") as mock_run:
+            mock_run.return_value.returncode = 0
+            mock_run.return_value.stdout = (
+                "# branch.oid abc123def456\n"
+                "# branch.head (detached)\n"
+            )
+            mock_run.return_value.stderr = ""
+
+            context = enhanced_context_analyzer.analyze_directory(
+                sample_project_dirs["git"]
+            )
+
+            assert context.git_branch == ""
 
     def test_detect_general_project(self, enhanced_context_analyzer, temp_dir):
         """Test general project detection for unknown types."""
@@ -121,6 +147,27 @@ class TestEnhancedContextAnalyzer:
         assert "main_language" in context
         assert context["project_type"] == "python"
 
+    def test_get_context_for_llm_reused_until_change(
+        self, enhanced_context_analyzer, sample_project_dirs
+    ):
+        """Test LLM context is reused for the same, unchanged directory."""
+        python_dir = sample_project_dirs["python"]
+        node_dir = sample_project_dirs["node"]
+
+        context1 = enhanced_context_analyzer.get_context_for_llm(python_dir)
+        assert enhanced_context_analyzer.get_context_for_llm(python_dir) is context1
+
+        other = enhanced_context_analyzer.get_context_for_llm(node_dir)
+        assert other["project_type"] == "nodejs"
+
+        mtime = python_dir.stat().st_mtime_ns
+        (python_dir / "new_module.py").write_text("")
+        os.utime(python_dir, ns=(mtime, mtime + 1_000_000))
+
+        context2 = enhanced_context_analyzer.get_context_for_llm(python_dir)
+        assert context2 is not context1
+        assert "new_module.py" in context2["files"]
+
     def test_get_command_suggestions_python(
         self, enhanced_context_analyzer, sample_project_context
     ):
@@ -210,6 +257,28 @@ dependencies = [
         assert "click" in context.dependencies
         assert "pydantic" in context.dependencies
 
+    def test_dependency_parsing_requirements_txt(
+        self, enhanced_context_analyzer, temp_dir
+    ):
+        """Test requirements.txt parsing handles specifiers and the size cap."""
+        python_dir = temp_dir / "python_reqs"
+        python_dir.mkdir()
+        lines = [
+            "# pinned deps",
+            "-r base.txt",
+            "requests==2.31.0",
+            "pydantic[email]>=2.0",
+            "uvicorn ; python_version >= '3.8'",
+            "numpy!=1.25.0",
+        ] + [f"pkg{i}>=1.0" for i in range(30)]
+        (python_dir / "requirements.txt").write_text("\n".join(lines))
+
+        context = enhanced_context_analyzer.analyze_directory(python_dir)
+
+        assert context.dependencies[:4] == ["requests", "pydantic", "uvicorn", "numpy"]
+        assert "-r" not in context.dependencies
+        assert len(context.dependencies) == 20
+
     def test_dependency_parsing_nodejs(self, enhanced_context_analyzer, temp_dir):
         """Test Node.js dependency parsing."""
         node_dir = temp_dir / "node_deps"
@@ -275,6 +344,25 @@ dependencies = [
         assert context.project_type in [ProjectType.PYTHON, ProjectType.NODEJS]
         assert context.confidence > 0.5
 
+    def test_extension_fallback_detection(self, enhanced_context_analyzer, temp_dir):
+        """Test detection from file extensions when no manifest is present."""
+        cpp_dir = temp_dir / "cpp_sources"
+        cpp_dir.mkdir()
+        (cpp_dir / "main.CPP").write_text("int main() {}")
+        (cpp_dir / "util.hpp").write_text("#pragma once")
+
+        context = enhanced_context_analyzer.analyze_directory(cpp_dir)
+        assert context.project_type == ProjectType.CPP
+        assert context.confidence == 0.6
+
+        script_dir = temp_dir / "scripts"
+        script_dir.mkdir()
+        for name in ("deploy.sh", "backup.bash", "report.pl"):
+            (script_dir / name).write_text("")
+
+        context = enhanced_context_analyzer.analyze_directory(script_dir)
+        assert context.project_type == ProjectType.SCRIPT
+
     def test_entry_point_detection(
         self, enhanced_context_analyzer, sample_project_dirs
     ):
@@ -310,6 +398,88 @@ dependencies = [
         assert context1.confidence == context2.confidence
         assert context1.main_language == context2.main_language
 
+    def test_context_cache_invalidation(self, enhanced_context_analyzer, temp_dir):
+        """Test that the cache is refreshed when directory contents change."""
+        project_dir = temp_dir / "changing_project"
+        project_dir.mkdir()
+        (project_dir / "main.rs").write_text("fn main() {}")
+
+        context1 = enhanced_context_analyzer.analyze_directory(project_dir)
+        assert enhanced_context_analyzer.analyze_directory(project_dir) is context1
+        assert context1.project_type == ProjectType.RUST
+
+        # Adding a file bumps the directory mtime; force it in case the
+        # filesystem timestamp granularity hides the change
+        mtime = project_dir.stat().st_mtime_ns
+        (project_dir / "package.json").write_text("{}")
+        os.utime(project_dir, ns=(mtime, mtime + 1_000_000))
+
+        context2 = enhanced_context_analyzer.analyze_directory(project_dir)
+        assert context2 is not context1
+        assert context2.project_type == ProjectType.NODEJS
+
+    def test_invalidate_forces_reanalysis(
+        self, enhanced_context_analyzer, sample_project_dirs
+    ):
+        """Test that invalidate() drops cached results for a directory."""
+        python_dir = sample_project_dirs["python"]
+
+        context1 = enhanced_context_analyzer.analyze_directory(python_dir)
+        llm_context1 = enhanced_context_analyzer.get_context_for_llm(python_dir)
+
+        enhanced_context_analyzer.invalidate(python_dir)
+
+        assert enhanced_context_analyzer.analyze_directory(python_dir) is not context1
+        assert (
+            enhanced_context_analyzer.get_context_for_llm(python_dir)
+            is not llm_context1
+        )
+
+    def test_manifest_parse_is_cached(self, enhanced_context_analyzer, temp_dir):
+        """Test that unchanged manifests are not re-parsed on re-analysis."""
+        import llmshell.context as context_module
+
+        project_dir = temp_dir / "reqs_project"
+        project_dir.mkdir()
+        req_file = project_dir / "requirements.txt"
+        req_file.write_text("requests\nclick\n")
+
+        with patch.object(
+            context_module,
+            "_parse_requirements",
+            wraps=context_module._parse_requirements,
+        ) as mock_parse:
+            enhanced_context_analyzer.analyze_directory(project_dir)
+
+            # A new file invalidates the directory entry but not the manifest
+            mtime = project_dir.stat().st_mtime_ns
+            (project_dir / "notes.txt").write_text("")
+            os.utime(project_dir, ns=(mtime, mtime + 1_000_000))
+            context = enhanced_context_analyzer.analyze_directory(project_dir)
+
+            assert context.dependencies == ["requests", "click"]
+            assert mock_parse.call_count == 1
+
+            req_file.write_text("requests\nclick\nrich\n")
+            mtime = project_dir.stat().st_mtime_ns
+            os.utime(project_dir, ns=(mtime, mtime + 2_000_000))
+            context = enhanced_context_analyzer.analyze_directory(project_dir)
+
+            assert context.dependencies == ["requests", "click", "rich"]
+            assert mock_parse.call_count == 2
+
+    def test_context_cache_is_bounded(self, enhanced_context_analyzer, temp_dir):
+        """Test that the project cache evicts least recently used entries."""
+        for i in range(70):
+            project_dir = temp_dir / f"project_{i}"
+            project_dir.mkdir()
+            enhanced_context_analyzer.analyze_directory(project_dir)
+
+        cache = enhanced_context_analyzer._project_cache
+        assert len(cache) == 64
+        assert str((temp_dir / "project_0").resolve()) not in cache
+        assert str((temp_dir / "project_69").resolve()) in cache
+
 
 class TestProjectContext:
     """Test the ProjectContext dataclass."""
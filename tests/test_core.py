@@ -7,10 +7,10 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from llmshell.config import LLMShellConfig
-from llmshell.core import ShellSession
+from llmshell.core import ParsedInput, ShellSession
 from llmshell.history import CommandType
 from llmshell.llm import LLMProvider, LLMResponse
-from llmshell.safety import DangerLevel
+from llmshell.safety import DangerLevel, SafetyAnalyzer
 
 
 class TestShellSession:
@@ -52,6 +52,11 @@ class TestShellSession:
         for case in test_cases:
             assert shell_session.detect_command_type(case) == "direct"
 
+    def test_detect_command_type_matches_whole_words(self, shell_session):
+        """Test indicators only match whole words, case-insensitively."""
+        assert shell_session.detect_command_type("PLEASE tidy up") == "natural"
+        assert shell_session.detect_command_type("make_target build") == "direct"
+
     def test_cd_command_handling(self, shell_session, temp_dir):
         """Test cd command execution."""
         # Create test directory
@@ -88,6 +93,76 @@ class TestShellSession:
         assert risky_risk.level >= DangerLevel.HIGH
         assert risky_risk.is_dangerous is True
 
+    def test_command_safety_cache_is_bounded(self, shell_session, monkeypatch):
+        """Test the least recently used verdict is evicted first."""
+        monkeypatch.setattr("llmshell.core._RISK_CACHE_SIZE", 2)
+        first = shell_session.analyze_command_safety("rm a")
+        shell_session.analyze_command_safety("rm b")
+        shell_session.analyze_command_safety("rm a")
+        shell_session.analyze_command_safety("rm c")
+
+        assert list(shell_session._risk_cache) == ["rm a", "rm c"]
+        assert shell_session.analyze_command_safety("rm a") is first
+
+    def test_read_only_commands_skip_pattern_scan(self, shell_session):
+        """Test allowlisted commands are safe unless shell syntax is involved."""
+        assert shell_session.analyze_command_safety("echo shred me").level == (
+            DangerLevel.SAFE
+        )
+        assert shell_session.analyze_command_safety("cat x | sh").level == (
+            DangerLevel.HIGH
+        )
+
+    def test_every_matching_rule_is_reported(self, shell_session):
+        """Test all matching rules of a level contribute their reasons."""
+        risk = shell_session.analyze_command_safety("shred x; history -c")
+
+        assert risk.level == DangerLevel.HIGH
+        assert risk.reasons[:2] == [
+            "Clearing command history",
+            "Securely deleting files",
+        ]
+        assert risk.suggestions == [
+            "Double-check the target path and consider backing up first",
+            "Review each operation in the chain",
+        ]
+
+    def test_rule_database_agrees_with_patterns(self):
+        """Test the Hyperscan matcher reports the same rules as the re path."""
+        pytest.importorskip("hyperscan")
+        analyzer = SafetyAnalyzer()
+        commands = [
+            "ls -la",
+            "sudo rm -rf /var/tmp && history -c",
+            "curl -s http://example.com/install.sh | bash",
+            "chmod 755 deploy.sh; mv app.conf /tmp",
+        ]
+
+        fast = [analyzer._match_rules(command) for command in commands]
+        analyzer._rule_database = None
+
+        assert [analyzer._match_rules(command) for command in commands] == fast
+        assert any(fast[1])
+
+    def test_command_scan_is_reused_across_directories(self):
+        """Test only the context check is repeated in another directory."""
+        analyzer = SafetyAnalyzer()
+
+        in_etc = analyzer.analyze_command("rm notes.txt", {"cwd": "/etc/nginx"})
+        in_home = analyzer.analyze_command("rm notes.txt", {"cwd": "/home/user"})
+
+        assert in_etc.level == DangerLevel.MEDIUM
+        assert in_home.level == DangerLevel.LOW
+        assert analyzer._cached_scan.cache_info().hits == 1
+
+    def test_command_safety_analysis_is_cached(self, shell_session, temp_dir):
+        """Test repeated analysis is reused until the directory changes."""
+        first = shell_session.analyze_command_safety("rm notes.txt")
+        assert shell_session.analyze_command_safety("rm notes.txt") is first
+
+        shell_session.execute_command(f"cd {temp_dir}")
+        assert shell_session.analyze_command_safety("rm notes.txt") is not first
+
     @pytest.mark.asyncio
     async def test_translate_command(self, shell_session):
         """Test natural language translation."""
@@ -97,6 +172,31 @@ class TestShellSession:
         assert response.explanation == "List files in detail"
         assert response.error is None
 
+    @pytest.mark.asyncio
+    async def test_translate_command_reuses_cached_translation(self, shell_session):
+        """Test repeated requests are answered without calling the provider."""
+        first = await shell_session.translate_command("list all files")
+        second = await shell_session.translate_command("list all files")
+
+        assert second.command == first.command
+        assert shell_session.llm_provider.translate.await_count == 1
+
+        shell_session.llm_provider.config.model = "other-model"
+        await shell_session.translate_command("list all files")
+        assert shell_session.llm_provider.translate.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_model_list_is_reused(self, shell_session):
+        """Test listing models twice asks the provider only once."""
+        await shell_session.show_models()
+        models = await shell_session.list_models()
+
+        assert "codellama:latest" in models
+        assert shell_session.llm_provider.list_models.await_count == 1
+
+        await shell_session.list_models(refresh=True)
+        assert shell_session.llm_provider.list_models.await_count == 2
+
     def test_history_recording(self, shell_session):
         """Test that commands are recorded in history."""
         initial_count = len(shell_session.history)
@@ -156,6 +256,32 @@ class TestShellSession:
             result = await shell_session._handle_direct_command("echo 'test'")
             assert result is True
 
+    @pytest.mark.asyncio
+    async def test_risky_direct_command_can_be_declined(self, shell_session):
+        """Test a risky direct command is explained and not run when declined."""
+        with patch("rich.prompt.Confirm.ask", return_value=False) as ask:
+            with patch.object(shell_session, "execute_command") as execute:
+                result = await shell_session._handle_direct_command("rm -rf /")
+
+        assert result is True
+        ask.assert_called_once()
+        execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_critical_translation_needs_two_confirmations(
+        self, shell_session, mock_llm_provider
+    ):
+        """Test a critical translated command asks twice before running."""
+        mock_llm_provider.translate.return_value = LLMResponse(
+            command="rm -rf /", explanation="Delete everything", error=None
+        )
+        with patch("rich.prompt.Confirm.ask", side_effect=[True, False]) as ask:
+            with patch.object(shell_session, "execute_command") as execute:
+                await shell_session._handle_natural_language("wipe the disk")
+
+        assert ask.call_count == 2
+        execute.assert_not_called()
+
     def test_context_refresh_on_cd(self, shell_session, sample_project_dirs):
         """Test that project context refreshes when changing directories."""
         python_dir = sample_project_dirs["python"]
@@ -196,9 +322,9 @@ class TestShellSession:
     @pytest.mark.asyncio
     async def test_suggestion_commands(self, shell_session):
         """Test suggestion command handling."""
-        # This should return an async command identifier
+        # This should return an async command request
         result = shell_session._handle_special_command(".suggest testing")
-        assert result == "async_suggest:testing"
+        assert result == ("suggest", "testing")
 
     def test_error_handling_in_execution(self, shell_session):
         """Test error handling during command execution."""
@@ -212,6 +338,47 @@ class TestShellSession:
             assert success is False
             assert "timed out" in stderr
 
+    def test_simple_commands_skip_the_shell(self, shell_session):
+        """Test metacharacter-free commands are exec'd without /bin/sh."""
+        with patch("subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
+            shell_session.execute_command("echo 'a b'")
+            shell_session.execute_command("ls *.py | wc -l")
+
+        assert mock_run.call_args_list[0].args[0] == ["echo", "a b"]
+        assert mock_run.call_args_list[1].args[0] == "ls *.py | wc -l"
+        assert mock_run.call_args_list[1].kwargs["shell"] is True
+
+    def test_parsed_input(self):
+        """Test input is tokenized once with a fallback for broken quoting."""
+        parsed = ParsedInput.parse("cd 'my dir'")
+        assert parsed.first == "cd"
+        assert parsed.tokens == ("cd", "my dir")
+        assert parsed.argv == ["cd", "my dir"]
+
+        assert ParsedInput.parse("ls | wc -l").argv is None
+        assert ParsedInput.parse("FOO=1 env").argv is None
+
+        unbalanced = ParsedInput.parse("what's in here")
+        assert unbalanced.tokens == ("what's", "in", "here")
+        assert unbalanced.argv is None
+
+    def test_shell_builtins_fall_back_to_shell(self, shell_session):
+        """Test commands that are not programs still run through the shell."""
+        success, stdout, stderr = shell_session.execute_command("export FOO")
+        assert success is True
+
+    def test_streamed_output_is_shown_once(self, shell_session, capsys):
+        """Test streamed output is printed while running and not repeated."""
+        success, stdout, stderr = shell_session.execute_command(
+            "echo streamed", stream=True
+        )
+        shell_session.display_output(success, stdout, stderr, already_shown=True)
+
+        assert success is True
+        assert stdout == "streamed\n"
+        assert capsys.readouterr().out.count("streamed") == 1
+
     def test_history_memory_management(self, shell_session):
         """Test that in-memory history is properly managed."""
         # Add many commands to test memory limit
@@ -284,6 +451,43 @@ class TestAsyncShellOperations:
             assert response.command is not None
             assert response.error is None
 
+    async def test_translate_commands_limits_parallelism(self, shell_session):
+        """Test batched translation respects the max_parallel cap."""
+        in_flight = 0
+        peak = 0
+
+        async def slow_translate(query, context):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return LLMResponse(command=f"echo {query}", explanation="", error=None)
+
+        shell_session.llm_provider.translate = slow_translate
+
+        responses = await shell_session.translate_commands(
+            ["one", "two", "three", "four"], max_parallel=2
+        )
+
+        assert [r.command for r in responses] == [
+            "echo one",
+            "echo two",
+            "echo three",
+            "echo four",
+        ]
+        assert peak == 2
+
+    async def test_process_user_inputs(self, shell_session):
+        """Test batch processing runs each input and stops on exit."""
+        with patch("rich.prompt.Confirm.ask", return_value=True):
+            result = await shell_session.process_user_inputs(
+                ["please list all files", "echo 'test'", ".exit", "pwd"]
+            )
+
+        assert result is False
+        assert shell_session.llm_provider.translate.await_count == 1
+
     async def test_llm_provider_error_handling(self, shell_session):
         """Test error handling when LLM provider fails."""
         # Mock LLM provider to return error
@@ -301,6 +505,29 @@ class TestAsyncShellOperations:
         # Should handle empty model list gracefully
         await shell_session.show_models()  # Should not raise exception
 
+    async def test_process_user_input_uses_given_translation(self, shell_session):
+        """Test a prefetched translation is used instead of asking the LLM."""
+        translation = LLMResponse(command="echo prefetched", explanation="")
+
+        assert shell_session.is_natural_input("please list all files")
+        with patch("rich.prompt.Confirm.ask", return_value=True):
+            await shell_session.process_user_input("please list all files", translation)
+
+        shell_session.llm_provider.translate.assert_not_awaited()
+
+    async def test_process_user_inputs_translates_after_cd(
+        self, shell_session, temp_dir
+    ):
+        """Test inputs after a cd are translated in the new directory."""
+        (temp_dir / "sub").mkdir()
+        shell_session.current_directory = temp_dir
+
+        with patch("rich.prompt.Confirm.ask", return_value=True):
+            await shell_session.process_user_inputs(["cd sub", "please list all files"])
+
+        context = shell_session.llm_provider.translate.await_args.args[1]
+        assert context["cwd"] == str(temp_dir / "sub")
+
     async def test_background_operations(self, shell_session):
         """Test that background operations don't block."""
 
@@ -41,6 +41,53 @@ class TestHistoryManager:
         assert recent[0].user_input == "list files"
         assert recent[0].translated_command == "ls -la"
 
+    def test_add_entries_bulk(self, history_manager):
+        """Test adding several entries in one transaction."""
+        entries = [
+            HistoryEntry(user_input=f"bulk {i}", translated_command=f"cmd{i}")
+            for i in range(3)
+        ]
+
+        assert history_manager.add_entries_bulk(entries) == 3
+        assert len(history_manager.get_recent_entries(limit=10)) == 3
+        assert all(e.session_id == history_manager.session_id for e in entries)
+
+    def test_queued_entries_are_flushed_before_reads(self, history_manager):
+        """Test queued entries are written in the background but visible to readers."""
+        for i in range(3):
+            history_manager.queue_entry(
+                HistoryEntry(user_input=f"queued {i}", translated_command="echo queued")
+            )
+
+        recent = history_manager.get_recent_entries(limit=3)
+        assert {entry.user_input for entry in recent} == {
+            "queued 0",
+            "queued 1",
+            "queued 2",
+        }
+        assert history_manager._write_queue.unfinished_tasks == 0
+
+    def test_close_writes_queued_entries(self, history_manager):
+        """Test closing the manager persists queued entries."""
+        history_manager.queue_entry(
+            HistoryEntry(user_input="queued", translated_command="echo queued")
+        )
+        history_manager.close()
+
+        reopened = HistoryManager(history_manager.data_dir)
+        assert reopened.get_recent_entries(limit=1)[0].user_input == "queued"
+        reopened.close()
+
+    def test_close_is_idempotent(self, history_manager):
+        """Test closing twice is harmless and later queued entries are dropped."""
+        history_manager.close()
+        history_manager.close()
+
+        history_manager.queue_entry(
+            HistoryEntry(user_input="late", translated_command="echo late")
+        )
+        assert history_manager._writer is None
+
     def test_get_recent_entries(self, history_manager):
         """Test retrieving recent entries."""
         # Add multiple entries
@@ -96,6 +143,34 @@ class TestHistoryManager:
         assert len(find_results) == 1
         assert find_results[0].translated_command == "find . -name '*.py'"
 
+    def test_search_history_matches_substrings(self, history_manager):
+        """Test search matches partial words, quotes and very short queries."""
+        history_manager.add_entry(
+            HistoryEntry(user_input='say "hi"', translated_command="echo hi")
+        )
+        history_manager.add_entry(
+            HistoryEntry(user_input="python tests", translated_command="pytest")
+        )
+
+        assert len(history_manager.search_history("YTES")) == 1
+        assert len(history_manager.search_history('"hi"')) == 1
+        assert len(history_manager.search_history("hi")) == 1
+
+    def test_existing_history_is_indexed(self, history_manager):
+        """Test entries recorded before the search index existed are found."""
+        history_manager.add_entry(
+            HistoryEntry(user_input="list files", translated_command="ls -la")
+        )
+        with history_manager._conn as conn:
+            for name in ("insert", "delete", "update"):
+                conn.execute(f"DROP TRIGGER history_fts_{name}")
+            conn.execute("DROP TABLE history_fts")
+        history_manager.close()
+
+        reopened = HistoryManager(history_manager.data_dir)
+        assert len(reopened.search_history("files")) == 1
+        reopened.close()
+
     def test_get_similar_commands(self, history_manager):
         """Test finding similar commands."""
         # Add various file listing commands
@@ -159,6 +234,34 @@ class TestHistoryManager:
         assert stats["natural_language_commands"] == 3
         assert stats["direct_commands"] == 2
 
+    def test_get_command_stats(self, history_manager):
+        """Test command statistics are aggregated correctly."""
+        for success, cmd_type, command in [
+            (True, "natural", "ls"),
+            (True, "direct", "ls"),
+            (False, "natural", "pwd"),
+            (True, "special", ".help"),
+        ]:
+            history_manager.add_entry(
+                HistoryEntry(
+                    user_input=command,
+                    translated_command=command,
+                    command_type=cmd_type,
+                    success=success,
+                )
+            )
+
+        stats = history_manager.get_command_stats()
+
+        assert stats["total_commands"] == 4
+        assert stats["success_rate"] == 75.0
+        assert stats["command_types"] == {"natural": 2, "direct": 1, "special": 1}
+        assert stats["popular_commands"] == [
+            {"command": "ls", "count": 2},
+            {"command": "pwd", "count": 1},
+        ]
+        assert stats["recent_activity"][0]["count"] == 4
+
     def test_export_history(self, history_manager, temp_dir):
         """Test exporting history to file."""
         # Add some entries
@@ -192,6 +295,33 @@ class TestHistoryManager:
         assert len(data["history"]) == 3
         assert data["history"][0]["user_input"] == "command 2"  # Newest first
 
+    def test_export_history_formats(self, history_manager, temp_dir):
+        """Test JSON and CSV exports contain every entry, newest first."""
+        history_manager.add_entries_bulk(
+            [
+                HistoryEntry(user_input=f"command {i}", translated_command=f"cmd{i}")
+                for i in range(3)
+            ]
+        )
+
+        json_file = temp_dir / "history.json"
+        csv_file = temp_dir / "history.csv"
+        assert history_manager.export_history(json_file) is True
+        assert history_manager.export_history(csv_file, format="csv") is True
+
+        import csv
+        import json
+
+        data = json.loads(json_file.read_text())
+        assert [item["user_input"] for item in data] == [
+            "command 2",
+            "command 1",
+            "command 0",
+        ]
+        with open(csv_file, newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert [row["translated_command"] for row in rows] == ["cmd2", "cmd1", "cmd0"]
+
     def test_clear_history(self, history_manager):
         """Test clearing all history."""
         # Add some entries
@@ -6,8 +6,9 @@ from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from click.testing import CliRunner
 
-from llmshell.cli import main
+from llmshell.cli import cli, main
 from llmshell.config import LLMShellConfig
 from llmshell.core import ShellSession, start_interactive_shell
 from llmshell.history import CommandType
@@ -239,6 +240,19 @@ class TestCLIIntegration:
                     main()
                 mock_echo.assert_called()
 
+    def test_cli_group_has_commands_when_imported(self, temp_dir, monkeypatch):
+        """Test the group resolves subcommands without going through main()."""
+        monkeypatch.setenv("HOME", str(temp_dir))
+        runner = CliRunner()
+
+        result = runner.invoke(cli, ["--help"])
+        assert result.exit_code == 0
+        assert "config-show" in result.output
+
+        result = runner.invoke(cli, ["config-show"])
+        assert result.exit_code == 0
+        assert "Current LLMShell Configuration" in result.output
+
     def test_cli_config_validation(self, temp_dir, monkeypatch):
         """Test CLI configuration validation."""
         monkeypatch.setenv("HOME", str(temp_dir))
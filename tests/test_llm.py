@@ -0,0 +1,114 @@
+"""Unit tests for LLM response handling."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from llmshell.config import LLMConfig
+from llmshell.llm import OllamaProvider, _strip_code_fences
+
+
+class TestStripCodeFences:
+    """Test markdown cleanup of model replies."""
+
+    def test_fenced_command(self):
+        """Test the fence lines around a command are removed."""
+        assert _strip_code_fences("```bash\nls -la\n```") == "ls -la"
+
+    def test_comments_outside_fences_are_dropped(self):
+        """Test comments are only removed outside code blocks."""
+        reply = "# list files\n```\n# keep me\nls\n```\n# trailing note"
+        assert _strip_code_fences(reply) == "# keep me\nls"
+
+    def test_indented_fences(self):
+        """Test fence lines with leading whitespace are recognised."""
+        assert _strip_code_fences("  ```sh\n  pwd\n  ```") == "pwd"
+
+
+class TestOllamaProvider:
+    """Test the Ollama provider against a mocked HTTP transport."""
+
+    @pytest.mark.asyncio
+    async def test_translations_do_not_block_the_event_loop(self):
+        """Test concurrent translations are in flight at the same time."""
+        in_flight = 0
+        both_started = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal in_flight
+            in_flight += 1
+            if in_flight == 2:
+                both_started.set()
+            # A blocking client would never let the second request start
+            await asyncio.wait_for(both_started.wait(), timeout=2)
+            return httpx.Response(200, json={"response": "ls -la"})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        provider = OllamaProvider(LLMConfig(), client)
+
+        responses = await asyncio.gather(
+            provider.translate("list files"), provider.translate("show files")
+        )
+
+        assert [response.command for response in responses] == ["ls -la", "ls -la"]
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_streaming_stops_after_first_line(self):
+        """Test the reply stream is abandoned once the command line is complete."""
+        sent = []
+
+        async def body():
+            for token in ["ls", " -la\n", "This lists", " files", " | in detail"]:
+                sent.append(token)
+                yield json.dumps({"response": token, "done": False}).encode() + b"\n"
+
+        client = httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, content=body())
+            )
+        )
+        response = await OllamaProvider(LLMConfig(), client).translate("list files")
+
+        assert response.command == "ls -la"
+        assert len(sent) < 5
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "tokens, command",
+        [
+            (["```bash\n", "cd src &&\n", "ls\n", "```"], "cd src &&\nls"),
+            (["make build \\\n", "  install", ""], "make build \\\n  install"),
+        ],
+    )
+    async def test_streaming_waits_for_multiline_commands(self, tokens, command):
+        """Test fenced and continued commands are read to the end."""
+        lines = [
+            json.dumps({"response": token, "done": i == len(tokens) - 1})
+            for i, token in enumerate(tokens)
+        ]
+        client = httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, text="\n".join(lines))
+            )
+        )
+        response = await OllamaProvider(LLMConfig(), client).translate("build it")
+
+        assert response.command == command
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_http_errors_are_reported(self):
+        """Test a non-200 reply becomes an error response."""
+        client = httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(404, text="model not found")
+            )
+        )
+        response = await OllamaProvider(LLMConfig(), client).translate("list files")
+
+        assert response.error == "Ollama API error: 404 - model not found"
+        await client.aclose()
@@ -0,0 +1,81 @@
+"""Tests for the persistent shell process."""
+
+import atexit
+import shutil
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from llmshell.shell import PersistentShell
+
+pytestmark = pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+
+
+@pytest.fixture
+def persistent_shell():
+    """Create a persistent shell and shut it down afterwards."""
+    shell = PersistentShell()
+    yield shell
+    shell.close()
+
+
+class TestPersistentShell:
+    """Test framing and state handling of the persistent shell."""
+
+    def test_output_and_exit_status(self, persistent_shell, temp_dir):
+        """Test stdout, stderr and exit status are framed per command."""
+        result, cwd = persistent_shell.run(
+            "printf out; echo err >&2; false", temp_dir, 5
+        )
+
+        assert result.stdout == "out"
+        assert result.stderr == "err\n"
+        assert result.returncode == 1
+        assert cwd == temp_dir
+
+    def test_state_persists_between_commands(self, persistent_shell, temp_dir):
+        """Test environment and working directory survive across commands."""
+        (temp_dir / "sub").mkdir()
+
+        persistent_shell.run("export LLMSHELL_TEST=1", temp_dir, 5)
+        result, cwd = persistent_shell.run("cd sub && echo $LLMSHELL_TEST", temp_dir, 5)
+
+        assert result.stdout == "1\n"
+        assert cwd == Path(temp_dir / "sub").resolve()
+
+    def test_syntax_error_does_not_hang(self, persistent_shell, temp_dir):
+        """Test an unterminated quote fails instead of eating the marker."""
+        result, _ = persistent_shell.run('echo "unterminated', temp_dir, 5)
+
+        assert result.returncode != 0
+
+    def test_timeout_restarts_shell(self, persistent_shell, temp_dir):
+        """Test a timed out command is killed and the next one still runs."""
+        with pytest.raises(subprocess.TimeoutExpired):
+            persistent_shell.run("sleep 5", temp_dir, 0.2)
+
+        result, _ = persistent_shell.run("echo ok", temp_dir, 5)
+        assert result.stdout == "ok\n"
+
+    def test_exit_restarts_shell(self, persistent_shell, temp_dir):
+        """Test a command that exits the shell reports its status."""
+        result, _ = persistent_shell.run("exit 3", temp_dir, 5)
+        assert result.returncode == 3
+
+        result, _ = persistent_shell.run("echo ok", temp_dir, 5)
+        assert result.stdout == "ok\n"
+
+    def test_close_removes_exit_hook(self, temp_dir):
+        """Test a closed shell is no longer held by its atexit hook."""
+        shell = PersistentShell()
+        with (
+            patch.object(atexit, "register") as register,
+            patch.object(atexit, "unregister") as unregister,
+        ):
+            shell.run("true", temp_dir, 5)
+            register.assert_called_once_with(shell.close)
+
+            shell.close()
+            unregister.assert_called_with(shell.close)